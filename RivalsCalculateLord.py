@@ -1,31 +1,34 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, font, colorchooser
-import math
-import json
+from tkinter import ttk, messagebox, font
 import os
-import webbrowser
-
-# Rank thresholds based on PDF (points needed to reach next rank from current)
-RANK_THRESHOLDS = {
-    "Agent": 500,
-    "Knight": 1200,
-    "Captain": 2000,
-    "Centurion": 2400,
-    "Lord": 0  # No further threshold
-}
-
-# Points per mission based on rank (from PDF)
-POINTS_PER_MISSION = {
-    "Agent": 10,
-    "Knight": 25,
-    "Captain": 40,
-    "Centurion": 50,
-    "Lord": 50  # Same as Centurion
-}
+import sys
+import time
+from collections import deque
+
+# The catalog, storage and planning modules are imported once the window is up, see _load_data()
+from heroes import ROLES, HeroRegistry
+from profiling import Profiler
+from ranks import RANK_THRESHOLDS
+from render import OutputRenderer
+from search import CharacterIndex
+from stalls import StallMonitor
+
+# Typing pause before the character search runs
+SEARCH_DELAY_MS = 150
+PLAN_POLL_MS = 16  # one frame at 60 fps
+# Wait after the window is mapped for its first redraw before loading data
+FIRST_PAINT_MS = 50
+REPO_URL = "https://github.com/P13rlU/marvel-rivals-lord-calculator"
 
 class MarvelRivalsCalculator(tk.Tk):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, lazy=True, profiler=None):
+        """With ``lazy`` the catalog and saved progress are loaded once the window has been drawn.
+
+        ``profiler`` (a :class:`profiling.Profiler`) times startup and the hot handlers.
+        """
+        self.profiler = profiler or Profiler()
+        with self.profiler.phase("tk init"):
+            super().__init__()
         self.title("Marvel Rivals - Lord Rank Calculator v1.2.1 ~ Made by P13r_._")
         self.geometry("939x750")
 
@@ -34,31 +37,55 @@ class MarvelRivalsCalculator(tk.Tk):
         self.current_points_var = tk.StringVar(value="0")
         self.hours_played_var = tk.StringVar(value="0")
 
-        # Mission data parsed from PDF
-        self.mission_data = self.get_mission_data()
+        # Mission data and saved progress, see _load_data()
+        self.catalog = None
+        self.store = None
 
         # Role categorization for filter
-        self.roles = {
-            "Vanguard": ["Banner/Hulk", "Captain America", "Doctor Strange", "Groot", "Magneto", "Venom", "Emma Frost", "The Thing", "Peni Parker", "Angela", "Rogue"],
-            "Duelist": ["Black Panther", "Black Widow", "Hawkeye", "Hela", "Iron Fist", "Iron Man", "Magik", "Moon Knight", "Namor", "Psylocke", "Scarlet Witch", "Spider-Man", "Squirrel Girl", "Star-Lord", "Storm", "The Punisher", "Winter Soldier", "Wolverine", "Blade", "Human Torch", "Phoenix", "Daredevil"],
-            "Strategist": ["Adam Warlock", "Cloak & Dagger", "Invisible Woman", "Jeff The Land Shark", "Loki", "Luna Snow", "Mantis", "Mister Fantastic", "Rocket Raccoon", "Thor", "Ultron", "Gambit"]
-        }
+        self.roles = ROLES
+        self.search_index = CharacterIndex(self.roles)
 
         # Character and rank selection
         self.current_character = tk.StringVar(value="")
         self.current_mission_rank = tk.StringVar(value="Agent")  # Separate from player rank
 
         # Checklist for completed characters and missions
-        self.completed_data = self.load_completed()
-        self.completed_characters = self.completed_data.get("characters", set())
-        self.completed_missions = self.completed_data.get("missions", {})
+        self.completed_characters = set()  # hero ids
+        self.completed_missions = set()  # mission ids
+        # Custom missions have no id: (character, rank, name)
+        self.completed_custom = set()
+
+        # Sorted character lists per role filter, built once
+        self.heroes = HeroRegistry(self.roles)
 
         self._updating_combobox = False
+        self._shown_characters = None  # (role, ascending, registry version) last put in the combobox
+
+        # Pending character search: only the latest keystroke is served
+        self._search_job = None
+        self._search_generation = 0
+        self._search_started = None
+        self._popup_open = False
+        self.search_latencies = deque(maxlen=500)  # seconds, keystroke → results shown
+
+        # Plans are computed off the Tk thread; only the latest request is shown (set up in _load_data())
+        self.plan_worker = None
+        # Repeated plans come from the cache; a new catalog or any completion toggle empties it
+        self.plan_cache = None
+        self._completion_revision = 0
+        self._timed_plan = None
+        self._plan_poll = None
+        self._load_job = None
 
         # Mission storage (loaded dynamically)
         self.characters = {}
         self.mission_requirements = {}
 
+        # Row model behind the mission Listbox
+        self._mission_key = None  # (character, rank) the rows belong to
+        self._row_labels = []  # (name, mission id or None, label, completed label) per row
+        self.mission_rows = []  # text currently shown in each Listbox row
+
         # Customization variables
         self.bg_color = tk.StringVar(value="#ffffff")  # Default white
         self.fg_color = tk.StringVar(value="#000000")  # Default black
@@ -73,1358 +100,83 @@ class MarvelRivalsCalculator(tk.Tk):
         # Sort state
         self.sort_ascending = tk.BooleanVar(value=True)  # True for A-Z, False for Z-A
 
-        self._build_ui()
-        self.update_char_combobox()  # Initialize character list
-
-        self.protocol("WM_DELETE_WINDOW", self.on_close)
-
-    def load_completed(self):
-        if os.path.exists("completed.json"):
-            with open("completed.json", "r") as f:
-                data = json.load(f)
-                # Convert lists back to sets for completed characters
-                data["characters"] = set(data.get("characters", []))
-                # Convert mission lists back to sets
-                missions = data.get("missions", {})
-                for char in missions:
-                    for rank in missions[char]:
-                        missions[char][rank] = set(missions[char][rank])
-                data["missions"] = missions
-                return data
-        return {"characters": set(), "missions": {}}
-
-    def save_completed(self):
-        # Convert sets to lists for JSON serialization
-        serializable_missions = {}
-        for char in self.completed_missions:
-            serializable_missions[char] = {}
-            for rank in self.completed_missions[char]:
-                serializable_missions[char][rank] = list(self.completed_missions[char][rank])
-        with open("completed.json", "w") as f:
-            json.dump({
-                "characters": list(self.completed_characters),
-                "missions": serializable_missions
-            }, f)
-
-    def on_close(self):
-        self.save_completed()
-        self.destroy()
-
-    def get_mission_data(self):
-        data = {}
-
-        # Adam Warlock
-        data["Adam Warlock"] = {
-            "Agent": {
-                "Heal Damage": {"requirement": 10000},
-                "KOs/Assists": {"requirement": 20},
-                "Revive Allies with Karmic Revival": {"requirement": 5}
-            },
-            "Knight": {
-                "Heal Damage": {"requirement": 25000},
-                "KOs/Assists": {"requirement": 50},
-                "Revive Allies with Karmic Revival": {"requirement": 12}
-            },
-            "Captain": {
-                "Heal Damage": {"requirement": 42000},
-                "KOs/Assists": {"requirement": 80},
-                "Revive Allies with Karmic Revival": {"requirement": 20}
-            },
-            "Centurion": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 100},
-                "Revive Allies with Karmic Revival": {"requirement": 25}
-            },
-            "Lord": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 100},
-                "Revive Allies with Karmic Revival": {"requirement": 25}
-            }
-        }
-
-        # Angela
-        data["Angela"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 15000},
-                "KOs": {"requirement": 12},
-                "Accumulate Attack Charge": {"requirement": 3000}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 35000},
-                "KOs": {"requirement": 30},
-                "Accumulate Attack Charge": {"requirement": 7500}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 60000},
-                "KOs": {"requirement": 50},
-                "Accumulate Attack Charge": {"requirement": 12000}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 75000},
-                "KOs": {"requirement": 65},
-                "Accumulate Attack Charge": {"requirement": 15000}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 75000},
-                "KOs": {"requirement": 65},
-                "Accumulate Attack Charge": {"requirement": 15000}
-            }
-        }
-
-        # Banner/Hulk
-        data["Banner/Hulk"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 21000},
-                "KOs": {"requirement": 10},
-                "Add Indestructible Guard to Allies": {"requirement": 20}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 55000},
-                "KOs": {"requirement": 25},
-                "Add Indestructible Guard to Allies": {"requirement": 50}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 85000},
-                "KOs": {"requirement": 42},
-                "Add Indestructible Guard to Allies": {"requirement": 80}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 110000},
-                "KOs": {"requirement": 55},
-                "Add Indestructible Guard to Allies": {"requirement": 100}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 110000},
-                "KOs": {"requirement": 55},
-                "Add Indestructible Guard to Allies": {"requirement": 100}
-            }
-        }
-
-        # Black Panther
-        data["Black Panther"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 7500},
-                "Final Hits": {"requirement": 10},
-                "Use Spirit Road": {"requirement": 30}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 25},
-                "Use Spirit Road": {"requirement": 70}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 30000},
-                "Final Hits": {"requirement": 40},
-                "Use Spirit Road": {"requirement": 120}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 38000},
-                "Final Hits": {"requirement": 50},
-                "Use Spirit Road": {"requirement": 150}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 38000},
-                "Final Hits": {"requirement": 50},
-                "Use Spirit Road": {"requirement": 150}
-            }
-        }
-
-        # Black Widow
-        data["Black Widow"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 6000},
-                "Land Final Hits": {"requirement": 10},
-                "Achieve Critical Hits": {"requirement": 5}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 15000},
-                "Land Final Hits": {"requirement": 25},
-                "Achieve Critical Hits": {"requirement": 15}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 25000},
-                "Land Final Hits": {"requirement": 40},
-                "Achieve Critical Hits": {"requirement": 25}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 30000},
-                "Land Final Hits": {"requirement": 50},
-                "Achieve Critical Hits": {"requirement": 30}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 30000},
-                "Land Final Hits": {"requirement": 50},
-                "Achieve Critical Hits": {"requirement": 30}
-            }
-        }
-
-        # Captain America
-        data["Captain America"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 20000},
-                "KOs": {"requirement": 12},
-                "Grant Bonus Health with Hero Charge": {"requirement": 3500}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 45000},
-                "KOs": {"requirement": 30},
-                "Grant Bonus Health with Hero Charge": {"requirement": 9000}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 70000},
-                "KOs": {"requirement": 50},
-                "Grant Bonus Health with Hero Charge": {"requirement": 14000}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 90000},
-                "KOs": {"requirement": 65},
-                "Grant Bonus Health with Hero Charge": {"requirement": 18000}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 90000},
-                "KOs": {"requirement": 65},
-                "Grant Bonus Health with Hero Charge": {"requirement": 18000}
-            }
-        }
-
-        # Cloak & Dagger
-        data["Cloak & Dagger"] = {
-            "Agent": {
-                "Heal Damage": {"requirement": 10000},
-                "KOs/Assists": {"requirement": 15},
-                "Use Terror Cape to Hit Heroes": {"requirement": 10}
-            },
-            "Knight": {
-                "Heal Damage": {"requirement": 25000},
-                "KOs/Assists": {"requirement": 40},
-                "Use Terror Cape to Hit Heroes": {"requirement": 24}
-            },
-            "Captain": {
-                "Heal Damage": {"requirement": 42000},
-                "KOs/Assists": {"requirement": 65},
-                "Use Terror Cape to Hit Heroes": {"requirement": 36}
-            },
-            "Centurion": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 80},
-                "Use Terror Cape to Hit Heroes": {"requirement": 45}
-            },
-            "Lord": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 80},
-                "Use Terror Cape to Hit Heroes": {"requirement": 45}
-            }
-        }
-
-        # Daredevil
-        data["Daredevil"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 7500},
-                "Land Final Hits": {"requirement": 10},
-                "Accumulate Fury": {"requirement": 140}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Land Final Hits": {"requirement": 25},
-                "Accumulate Fury": {"requirement": 350}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 30000},
-                "Land Final Hits": {"requirement": 40},
-                "Accumulate Fury": {"requirement": 560}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 38000},
-                "Land Final Hits": {"requirement": 50},
-                "Accumulate Fury": {"requirement": 700}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 38000},
-                "Land Final Hits": {"requirement": 10},
-                "Accumulate Fury": {"requirement": 700}
-            }
-        }
-
-        # Doctor Strange
-        data["Doctor Strange"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 21000},
-                "KOs": {"requirement": 12},
-                "Stun Enemies with Eye of Agamotto": {"requirement": 6}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 55000},
-                "KOs": {"requirement": 30},
-                "Stun Enemies with Eye of Agamotto": {"requirement": 15}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 85000},
-                "KOs": {"requirement": 50},
-                "Stun Enemies with Eye of Agamotto": {"requirement": 24}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 110000},
-                "KOs": {"requirement": 65},
-                "Stun Enemies with Eye of Agamotto": {"requirement": 30}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 110000},
-                "KOs": {"requirement": 65},
-                "Stun Enemies with Eye of Agamotto": {"requirement": 30}
-            }
-        }
-
-        # Gambit
-        data["Gambit"] = {
-            "Agent": {
-                "Heal Damage": {"requirement": 9000},
-                "KOs/Assists": {"requirement": 25},
-                "Use Sleight of Hand Stacks": {"requirement": 50}
-            },
-            "Knight": {
-                "Heal Damage": {"requirement": 23000},
-                "KOs/Assists": {"requirement": 60},
-                "Use Sleight of Hand Stacks": {"requirement": 125}
-            },
-            "Captain": {
-                "Heal Damage": {"requirement": 35000},
-                "KOs/Assists": {"requirement": 95},
-                "Use Sleight of Hand Stacks": {"requirement": 200}
-            },
-            "Centurion": {
-                "Heal Damage": {"requirement": 45000},
-                "KOs/Assists": {"requirement": 120},
-                "Use Sleight of Hand Stacks": {"requirement": 250}
-            },
-            "Lord": {
-                "Heal Damage": {"requirement": 45000},
-                "KOs/Assists": {"requirement": 120},
-                "Use Sleight of Hand Stacks": {"requirement": 250}
-            }
-        }
-
-        # Groot
-        data["Groot"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 27000},
-                "KOs": {"requirement": 12},
-                "Build Wooden Walls": {"requirement": 50}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 70000},
-                "KOs": {"requirement": 30},
-                "Build Wooden Walls": {"requirement": 120}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 110000},
-                "KOs": {"requirement": 50},
-                "Build Wooden Walls": {"requirement": 200}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 140000},
-                "KOs": {"requirement": 65},
-                "Build Wooden Walls": {"requirement": 250}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 140000},
-                "KOs": {"requirement": 65},
-                "Build Wooden Walls": {"requirement": 250}
-            }
-        }
-
-        # Hawkeye
-        data["Hawkeye"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 10000},
-                "Final Hits": {"requirement": 12},
-                "Score Hits with Hypersonic Arrow": {"requirement": 40}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 25000},
-                "Final Hits": {"requirement": 24},
-                "Score Hits with Hypersonic Arrow": {"requirement": 100}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 40000},
-                "Final Hits": {"requirement": 36},
-                "Score Hits with Hypersonic Arrow": {"requirement": 150}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 55},
-                "Score Hits with Hypersonic Arrow": {"requirement": 180}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 55},
-                "Score Hits with Hypersonic Arrow": {"requirement": 180}
-            }
-        }
-
-        # Hela
-        data["Hela"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 11000},
-                "Final Hits": {"requirement": 12},
-                "Stun Enemies with Soul Drainer": {"requirement": 6}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 28000},
-                "Final Hits": {"requirement": 30},
-                "Stun Enemies with Soul Drainer": {"requirement": 15}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Stun Enemies with Soul Drainer": {"requirement": 25}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 55000},
-                "Final Hits": {"requirement": 65},
-                "Stun Enemies with Soul Drainer": {"requirement": 32}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 55000},
-                "Final Hits": {"requirement": 65},
-                "Stun Enemies with Soul Drainer": {"requirement": 32}
-            }
-        }
-
-        # Invisible Woman
-        data["Invisible Woman"] = {
-            "Agent": {
-                "Heal Damage": {"requirement": 10000},
-                "KOs/Assists": {"requirement": 25},
-                "Block Damage with Guardian Shield": {"requirement": 5000}
-            },
-            "Knight": {
-                "Heal Damage": {"requirement": 25000},
-                "KOs/Assists": {"requirement": 60},
-                "Block Damage with Guardian Shield": {"requirement": 12500}
-            },
-            "Captain": {
-                "Heal Damage": {"requirement": 42000},
-                "KOs/Assists": {"requirement": 95},
-                "Block Damage with Guardian Shield": {"requirement": 20000}
-            },
-            "Centurion": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 120},
-                "Block Damage with Guardian Shield": {"requirement": 25000}
-            },
-            "Lord": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 120},
-                "Block Damage with Guardian Shield": {"requirement": 25000}
-            }
-        }
-
-        # Iron Fist
-        data["Iron Fist"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 6000},
-                "Final Hits": {"requirement": 8},
-                "Gain Bonus Heals with Dragon's Defense": {"requirement": 1500}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 15000},
-                "Final Hits": {"requirement": 25},
-                "Gain Bonus Heals with Dragon's Defense": {"requirement": 3500}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 25000},
-                "Final Hits": {"requirement": 35},
-                "Gain Bonus Heals with Dragon's Defense": {"requirement": 6000}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 30000},
-                "Final Hits": {"requirement": 45},
-                "Gain Bonus Heals with Dragon's Defense": {"requirement": 7500}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 30000},
-                "Final Hits": {"requirement": 45},
-                "Gain Bonus Heals with Dragon's Defense": {"requirement": 7500}
-            }
-        }
-
-        # Iron Man
-        data["Iron Man"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 8000},
-                "Final Hits": {"requirement": 8},
-                "Directly Hit Enemies with Repulsor Blast": {"requirement": 50}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 20},
-                "Directly Hit Enemies with Repulsor Blast": {"requirement": 120}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 35000},
-                "Final Hits": {"requirement": 35},
-                "Directly Hit Enemies with Repulsor Blast": {"requirement": 200}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 40},
-                "Directly Hit Enemies with Repulsor Blast": {"requirement": 250}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 40},
-                "Directly Hit Enemies with Repulsor Blast": {"requirement": 250}
-            }
-        }
-
-        # Jeff The Land Shark
-        data["Jeff The Land Shark"] = {
-            "Agent": {
-                "Heal Damage": {"requirement": 10000},
-                "KOs/Assists": {"requirement": 20},
-                "Swallow Heroes with It's Jeff!": {"requirement": 4}
-            },
-            "Knight": {
-                "Heal Damage": {"requirement": 25000},
-                "KOs/Assists": {"requirement": 50},
-                "Swallow Heroes with It's Jeff!": {"requirement": 10}
-            },
-            "Captain": {
-                "Heal Damage": {"requirement": 42000},
-                "KOs/Assists": {"requirement": 80},
-                "Swallow Heroes with It's Jeff!": {"requirement": 16}
-            },
-            "Centurion": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 100},
-                "Swallow Heroes with It's Jeff!": {"requirement": 20}
-            },
-            "Lord": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 100},
-                "Swallow Heroes with It's Jeff!": {"requirement": 20}
-            }
-        }
-
-        # Loki
-        data["Loki"] = {
-            "Agent": {
-                "Heal Damage": {"requirement": 10000},
-                "KOs/Assists": {"requirement": 25},
-                "Conjure Illusions": {"requirement": 40}
-            },
-            "Knight": {
-                "Heal Damage": {"requirement": 25000},
-                "KOs/Assists": {"requirement": 60},
-                "Conjure Illusions": {"requirement": 100}
-            },
-            "Captain": {
-                "Heal Damage": {"requirement": 42000},
-                "KOs/Assists": {"requirement": 95},
-                "Conjure Illusions": {"requirement": 150}
-            },
-            "Centurion": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 120},
-                "Conjure Illusions": {"requirement": 180}
-            },
-            "Lord": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 120},
-                "Conjure Illusions": {"requirement": 180}
-            }
-        }
-
-        # Luna Snow
-        data["Luna Snow"] = {
-            "Agent": {
-                "Heal Damage": {"requirement": 12000},
-                "KOs/Assists": {"requirement": 25},
-                "Freeze Enemies with Absolute Zero": {"requirement": 4}
-            },
-            "Knight": {
-                "Heal Damage": {"requirement": 30000},
-                "KOs/Assists": {"requirement": 60},
-                "Freeze Enemies with Absolute Zero": {"requirement": 4}
-            },
-            "Captain": {
-                "Heal Damage": {"requirement": 50000},
-                "KOs/Assists": {"requirement": 95},
-                "Freeze Enemies with Absolute Zero": {"requirement": 16}
-            },
-            "Centurion": {
-                "Heal Damage": {"requirement": 60000},
-                "KOs/Assists": {"requirement": 120},
-                "Freeze Enemies with Absolute Zero": {"requirement": 20}
-            },
-            "Lord": {
-                "Heal Damage": {"requirement": 60000},
-                "KOs/Assists": {"requirement": 120},
-                "Freeze Enemies with Absolute Zero": {"requirement": 20}
-            }
-        }
-
-        # Magik
-        data["Magik"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 8000},
-                "Final Hits": {"requirement": 10},
-                "Gain Bonus Health with Limbo's Might": {"requirement": 2500}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 25},
-                "Gain Bonus Health with Limbo's Might": {"requirement": 6000}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 35000},
-                "Final Hits": {"requirement": 40},
-                "Gain Bonus Health with Limbo's Might": {"requirement": 10000}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Gain Bonus Health with Limbo's Might": {"requirement": 13000}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Gain Bonus Health with Limbo's Might": {"requirement": 13000}
-            }
-        }
-
-        # Magneto
-        data["Magneto"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 20000},
-                "KOs": {"requirement": 15},
-                "Absorb Damage with Meteor M": {"requirement": 2000}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 45000},
-                "KOs": {"requirement": 35},
-                "Absorb Damage with Meteor M": {"requirement": 5000}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 70000},
-                "KOs": {"requirement": 60},
-                "Absorb Damage with Meteor M": {"requirement": 8000}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 90000},
-                "KOs": {"requirement": 75},
-                "Absorb Damage with Meteor M": {"requirement": 10000}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 90000},
-                "KOs": {"requirement": 75},
-                "Absorb Damage with Meteor M": {"requirement": 10000}
-            }
-        }
-
-        # Mantis
-        data["Mantis"] = {
-            "Agent": {
-                "Heal Damage": {"requirement": 10000},
-                "KOs/Assists": {"requirement": 25},
-                "Sedate Enemies with Spore Slumber": {"requirement": 5}
-            },
-            "Knight": {
-                "Heal Damage": {"requirement": 25000},
-                "KOs/Assists": {"requirement": 65},
-                "Sedate Enemies with Spore Slumber": {"requirement": 12}
-            },
-            "Captain": {
-                "Heal Damage": {"requirement": 42000},
-                "KOs/Assists": {"requirement": 100},
-                "Sedate Enemies with Spore Slumber": {"requirement": 20}
-            },
-            "Centurion": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 130},
-                "Sedate Enemies with Spore Slumber": {"requirement": 25}
-            },
-            "Lord": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 130},
-                "Sedate Enemies with Spore Slumber": {"requirement": 25}
-            }
-        }
-
-        # Mister Fantastic
-        data["Mister Fantastic"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 10000},
-                "Final Hits": {"requirement": 10},
-                "Inflate": {"requirement": 15}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 25000},
-                "Final Hits": {"requirement": 25},
-                "Inflate": {"requirement": 35}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 40000},
-                "Final Hits": {"requirement": 40},
-                "Inflate": {"requirement": 60}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 50},
-                "Inflate": {"requirement": 75}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 50},
-                "Inflate": {"requirement": 75}
-            }
-        }
-
-        # Moon Knight
-        data["Moon Knight"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 8000},
-                "Final Hits": {"requirement": 8},
-                "Inflict Hits on Enemies with Ankhs": {"requirement": 400}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 20},
-                "Inflict Hits on Enemies with Ankhs": {"requirement": 1000}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 35000},
-                "Final Hits": {"requirement": 35},
-                "Inflict Hits on Enemies with Ankhs": {"requirement": 1500}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 40},
-                "Inflict Hits on Enemies with Ankhs": {"requirement": 2000}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 40},
-                "Inflict Hits on Enemies with Ankhs": {"requirement": 2000}
-            }
-        }
-
-        # Namor
-        data["Namor"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 10000},
-                "Final Hits": {"requirement": 8},
-                "Summon Monstro Spawns": {"requirement": 50}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 25000},
-                "Final Hits": {"requirement": 20},
-                "Summon Monstro Spawns": {"requirement": 120}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 40000},
-                "Final Hits": {"requirement": 35},
-                "Summon Monstro Spawns": {"requirement": 200}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 40},
-                "Summon Monstro Spawns": {"requirement": 250}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 40},
-                "Summon Monstro Spawns": {"requirement": 250}
-            }
-        }
-
-        # Peni Parker
-        data["Peni Parker"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 15000},
-                "KOs": {"requirement": 15},
-                "Deal Damage with Arachno-Mines": {"requirement": 2500}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 35000},
-                "KOs": {"requirement": 35},
-                "Deal Damage with Arachno-Mines": {"requirement": 6000}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 60000},
-                "KOs": {"requirement": 60},
-                "Deal Damage with Arachno-Mines": {"requirement": 10000}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 75000},
-                "KOs": {"requirement": 75},
-                "Deal Damage with Arachno-Mines": {"requirement": 15000}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 75000},
-                "KOs": {"requirement": 75},
-                "Deal Damage with Arachno-Mines": {"requirement": 15000}
-            }
-        }
-
-        # Psylocke
-        data["Psylocke"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 7500},
-                "Final Hits": {"requirement": 10},
-                "Be Invisible with Psychic Stealth": {"requirement": 40}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 25},
-                "Be Invisible with Psychic Stealth": {"requirement": 100}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 30000},
-                "Final Hits": {"requirement": 40},
-                "Be Invisible with Psychic Stealth": {"requirement": 160}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 38000},
-                "Final Hits": {"requirement": 50},
-                "Be Invisible with Psychic Stealth": {"requirement": 200}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 38000},
-                "Final Hits": {"requirement": 50},
-                "Be Invisible with Psychic Stealth": {"requirement": 200}
-            }
-        }
-
-        # Rocket Raccoon
-        data["Rocket Raccoon"] = {
-            "Agent": {
-                "Heal Damage": {"requirement": 10000},
-                "KOs/Assists": {"requirement": 25},
-                "Revive Allies with BRB": {"requirement": 6}
-            },
-            "Knight": {
-                "Heal Damage": {"requirement": 25000},
-                "KOs/Assists": {"requirement": 60},
-                "Revive Allies with BRB": {"requirement": 15}
-            },
-            "Captain": {
-                "Heal Damage": {"requirement": 42000},
-                "KOs/Assists": {"requirement": 95},
-                "Revive Allies with BRB": {"requirement": 25}
-            },
-            "Centurion": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 120},
-                "Revive Allies with BRB": {"requirement": 30}
-            },
-            "Lord": {
-                "Heal Damage": {"requirement": 54000},
-                "KOs/Assists": {"requirement": 120},
-                "Revive Allies with BRB": {"requirement": 30}
-            }
-        }
-
-        # Rogue
-        data["Rogue"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 20000},
-                "KOs": {"requirement": 12},
-                "Use Ability Absorption on heroes": {"requirement": 10}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 45000},
-                "KOs": {"requirement": 30},
-                "Use Ability Absorption on heroes": {"requirement": 25}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 70000},
-                "KOs": {"requirement": 50},
-                "Use Ability Absorption on heroes": {"requirement": 40}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 90000},
-                "KOs": {"requirement": 65},
-                "Use Ability Absorption on heroes": {"requirement": 50}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 90000},
-                "KOs": {"requirement": 65},
-                "Use Ability Absorption on heroes": {"requirement": 50}
-            }
-        }
-
-        # Scarlet Witch
-        data["Scarlet Witch"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 7500},
-                "Final Hits": {"requirement": 10},
-                "Stun Enemies with Dark Seal": {"requirement": 6}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 25},
-                "Stun Enemies with Dark Seal": {"requirement": 15}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 30000},
-                "Final Hits": {"requirement": 40},
-                "Stun Enemies with Dark Seal": {"requirement": 25}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 38000},
-                "Final Hits": {"requirement": 50},
-                "Stun Enemies with Dark Seal": {"requirement": 35}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 38000},
-                "Final Hits": {"requirement": 50},
-                "Stun Enemies with Dark Seal": {"requirement": 35}
-            }
-        }
-
-        # Spider-Man
-        data["Spider-Man"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 6000},
-                "Final Hits": {"requirement": 8},
-                "Trigger Spider-Tracers": {"requirement": 40}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 15000},
-                "Final Hits": {"requirement": 20},
-                "Trigger Spider-Tracers": {"requirement": 100}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 25000},
-                "Final Hits": {"requirement": 35},
-                "Trigger Spider-Tracers": {"requirement": 160}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 30000},
-                "Final Hits": {"requirement": 40},
-                "Trigger Spider-Tracers": {"requirement": 200}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 30000},
-                "Final Hits": {"requirement": 40},
-                "Trigger Spider-Tracers": {"requirement": 200}
-            }
-        }
-
-        # Squirrel Girl
-        data["Squirrel Girl"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 10000},
-                "Final Hits": {"requirement": 10},
-                "Immobilize Enemies with Squirrel Blockade": {"requirement": 10}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 25000},
-                "Final Hits": {"requirement": 25},
-                "Immobilize Enemies with Squirrel Blockade": {"requirement": 28}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 40000},
-                "Final Hits": {"requirement": 40},
-                "Immobilize Enemies with Squirrel Blockade": {"requirement": 45}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 50},
-                "Immobilize Enemies with Squirrel Blockade": {"requirement": 55}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 50},
-                "Immobilize Enemies with Squirrel Blockade": {"requirement": 55}
-            }
-        }
-
-        # Star-Lord
-        data["Star-Lord"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 8000},
-                "Final Hits": {"requirement": 10},
-                "Reload Magazines with Stellar Shift": {"requirement": 1000}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 25},
-                "Reload Magazines with Stellar Shift": {"requirement": 2500}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 35000},
-                "Final Hits": {"requirement": 40},
-                "Reload Magazines with Stellar Shift": {"requirement": 4000}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Reload Magazines with Stellar Shift": {"requirement": 5000}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Reload Magazines with Stellar Shift": {"requirement": 5000}
-            }
-        }
-
-        # Storm
-        data["Storm"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 8000},
-                "Final Hits": {"requirement": 10},
-                "Use Goddess Boost on Heroes": {"requirement": 75}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 25},
-                "Use Goddess Boost on Heroes": {"requirement": 200}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 35000},
-                "Final Hits": {"requirement": 40},
-                "Use Goddess Boost on Heroes": {"requirement": 300}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Use Goddess Boost on Heroes": {"requirement": 370}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Use Goddess Boost on Heroes": {"requirement": 370}
-            }
-        }
-
-        # The Punisher
-        data["The Punisher"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 10000},
-                "Final Hits": {"requirement": 10},
-                "Envelop Enemies with Scourge Grenade": {"requirement": 20}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 25000},
-                "Final Hits": {"requirement": 25},
-                "Envelop Enemies with Scourge Grenade": {"requirement": 50}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 40000},
-                "Final Hits": {"requirement": 40},
-                "Envelop Enemies with Scourge Grenade": {"requirement": 80}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 50},
-                "Envelop Enemies with Scourge Grenade": {"requirement": 100}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 50000},
-                "Final Hits": {"requirement": 50},
-                "Envelop Enemies with Scourge Grenade": {"requirement": 100}
-            }
-        }
-
-        # Thor
-        data["Thor"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 20000},
-                "KOs": {"requirement": 12},
-                "Accumulate Thorforce": {"requirement": 120}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 45000},
-                "KOs": {"requirement": 30},
-                "Accumulate Thorforce": {"requirement": 300}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 70000},
-                "KOs": {"requirement": 50},
-                "Accumulate Thorforce": {"requirement": 500}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 90000},
-                "KOs": {"requirement": 65},
-                "Accumulate Thorforce": {"requirement": 650}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 90000},
-                "KOs": {"requirement": 65},
-                "Accumulate Thorforce": {"requirement": 650}
-            }
-        }
+        self._font_families = None  # font.families() is slow, list it once
 
-        # Venom
-        data["Venom"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 20000},
-                "KOs": {"requirement": 12},
-                "Gain Bonus Health with Symbiotic Resilience": {"requirement": 8000}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 55000},
-                "KOs": {"requirement": 30},
-                "Gain Bonus Health with Symbiotic Resilience": {"requirement": 20000}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 85000},
-                "KOs": {"requirement": 50},
-                "Gain Bonus Health with Symbiotic Resilience": {"requirement": 32000}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 100000},
-                "KOs": {"requirement": 65},
-                "Gain Bonus Health with Symbiotic Resilience": {"requirement": 40000}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 100000},
-                "KOs": {"requirement": 65},
-                "Gain Bonus Health with Symbiotic Resilience": {"requirement": 40000}
-            }
-        }
+        # Before _build_ui, so the widgets get the timed handlers
+        self.profiler.wrap(self, "calculate", "refresh_missions", "save_completed", "apply_theme")
 
-        # Winter Soldier
-        data["Winter Soldier"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 7500},
-                "Final Hits": {"requirement": 8},
-                "Grab Enemies with Bionic Hook": {"requirement": 15}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 20},
-                "Grab Enemies with Bionic Hook": {"requirement": 35}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 30000},
-                "Final Hits": {"requirement": 35},
-                "Grab Enemies with Bionic Hook": {"requirement": 60}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 38000},
-                "Final Hits": {"requirement": 40},
-                "Grab Enemies with Bionic Hook": {"requirement": 75}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 38000},
-                "Final Hits": {"requirement": 40},
-                "Grab Enemies with Bionic Hook": {"requirement": 75}
-            }
-        }
+        with self.profiler.phase("build ui"):
+            self._build_ui()
+        with self.profiler.phase("first character list"):
+            self.update_char_combobox()  # Initialize character list
 
-        # Wolverine
-        data["Wolverine"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 8000},
-                "Final Hits": {"requirement": 10},
-                "Knock Down Enemies with Feral Leap": {"requirement": 10}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 25},
-                "Knock Down Enemies with Feral Leap": {"requirement": 25}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 35000},
-                "Final Hits": {"requirement": 40},
-                "Knock Down Enemies with Feral Leap": {"requirement": 40}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Knock Down Enemies with Feral Leap": {"requirement": 50}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Knock Down Enemies with Feral Leap": {"requirement": 50}
-            }
-        }
-
-        # Ultron
-        data["Ultron"] = {
-            "Agent": {
-                "Reach Healing": {"requirement": 10000},
-                "Achieve KOs/Assists": {"requirement": 25},
-                "Imperative: Firewall extra health": {"requirement": 4000}
-            },
-            "Knight": {
-                "Reach Healing": {"requirement": 25000},
-                "Achieve KOs/Assists": {"requirement": 65},
-                "Imperative: Firewall extra health": {"requirement": 10000}
-            },
-            "Captain": {
-                "Reach Healing": {"requirement": 42000},
-                "Achieve KOs/Assists": {"requirement": 100},
-                "Imperative: Firewall extra health": {"requirement": 16000}
-            },
-            "Centurion": {
-                "Reach Healing": {"requirement": 54000},
-                "Achieve KOs/Assists": {"requirement": 130},
-                "Imperative: Firewall extra health": {"requirement": 20000}
-            },
-            "Lord": {
-                "Reach Healing": {"requirement": 54000},
-                "Achieve KOs/Assists": {"requirement": 130},
-                "Imperative: Firewall extra health": {"requirement": 20000}
-            }
-        }
-
-        # Emma Frost
-        data["Emma Frost"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 21000},
-                "Achieve KOs": {"requirement": 15},
-                "Seize control of sentiences with Psychic Spear": {"requirement": 6}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 21000},
-                "Achieve KOs": {"requirement": 35},
-                "Seize control of sentiences with Psychic Spear": {"requirement": 15}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 85000},
-                "Achieve KOs": {"requirement": 60},
-                "Seize control of sentiences with Psychic Spear": {"requirement": 24}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 110000},
-                "Achieve KOs": {"requirement": 75},
-                "Seize control of sentiences with Psychic Spear": {"requirement": 30}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 110000},
-                "Achieve KOs": {"requirement": 75},
-                "Seize control of sentiences with Psychic Spear": {"requirement": 30}
-            }
-        }
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        # Blade
-        data["Blade"] = {
-            "Agent": {
-                "Reach Damage": {"requirement": 10000},
-                "Achieve Final Hits": {"requirement": 10},
-                "Lifesteal Health with Bloodline Awakening": {"requirement": 2500}
-            },
-            "Knight": {
-                "Reach Damage": {"requirement": 25000},
-                "Achieve Final Hits": {"requirement": 25},
-                "Lifesteal Health with Bloodline Awakening": {"requirement": 6250}
-            },
-            "Captain": {
-                "Reach Damage": {"requirement": 40000},
-                "Achieve Final Hits": {"requirement": 40},
-                "Lifesteal Health with Bloodline Awakening": {"requirement": 10000}
-            },
-            "Centurion": {
-                "Reach Damage": {"requirement": 50000},
-                "Achieve Final Hits": {"requirement": 50},
-                "Lifesteal Health with Bloodline Awakening": {"requirement": 12500}
-            },
-            "Lord": {
-                "Reach Damage": {"requirement": 50000},
-                "Achieve Final Hits": {"requirement": 50},
-                "Lifesteal Health with Bloodline Awakening": {"requirement": 12500}
-            }
-        }
+        if lazy:
+            self.bind("<Map>", self._on_first_map, add="+")
+        else:
+            self._load_data()
 
-        # Phoenix
-        data["Phoenix"] = {
-            "Agent": {
-                "Deal Damage": {"requirement": 11000},
-                "Final Hits": {"requirement": 12},
-                "Trigger Spark Explosions": {"requirement": 80}
-            },
-            "Knight": {
-                "Deal Damage": {"requirement": 28000},
-                "Final Hits": {"requirement": 30},
-                "Trigger Spark Explosions": {"requirement": 200}
-            },
-            "Captain": {
-                "Deal Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 50},
-                "Trigger Spark Explosions": {"requirement": 320}
-            },
-            "Centurion": {
-                "Deal Damage": {"requirement": 55000},
-                "Final Hits": {"requirement": 65},
-                "Trigger Spark Explosions": {"requirement": 400}
-            },
-            "Lord": {
-                "Deal Damage": {"requirement": 55000},
-                "Final Hits": {"requirement": 65},
-                "Trigger Spark Explosions": {"requirement": 400}
-            }
-        }
+    def _on_first_map(self, event):
+        # Child widgets' <Map> events reach this binding too; only the window itself counts
+        if event.widget is not self or self._load_job is not None:
+            return
+        # <Map> arrives before the Expose events that draw the widgets: give them a moment,
+        # then finish any pending redraw before the load blocks the loop
+        self._load_job = self.after(FIRST_PAINT_MS, self._load_after_paint)
+
+    def _load_after_paint(self):
+        self.update_idletasks()
+        self._load_data()
+
+    def _load_data(self):
+        self.profiler.mark("window shown")
+        with self.profiler.phase("import modules"):
+            from catalog import load_catalog
+            from planner import PlanCache
+            from storage import open_store
+            from worker import PlanWorker
+        self.plan_worker = PlanWorker()
+        self.plan_cache = PlanCache()
+        self._timed_plan = self.profiler.timed(self.plan_cache.plan, "plan (worker)")
+
+        # Mission data parsed from PDF (missions.json, compiled to missions.bin)
+        with self.profiler.phase("load catalog"):
+            self.catalog = load_catalog()
+
+        # completed.json by default; point RIVALS_CALC_STORE at a .db file to use SQLite
+        with self.profiler.phase("load completed"):
+            self.store = open_store(os.environ.get("RIVALS_CALC_STORE", "completed.json"),
+                                    profile=os.environ.get("RIVALS_CALC_PROFILE", "default"),
+                                    catalog=self.catalog)
+            self.completed_data = self.load_completed()
+        self.completed_characters = self.completed_data.get("characters", set())
+        self.completed_missions = self.completed_data.get("missions", set())
+        self.completed_custom = self.completed_data.get("custom", set())
 
-        # The Thing
-        data["The Thing"] = {
-            "Agent": {
-                "Block Damage": {"requirement": 21000},
-                "KOs": {"requirement": 15},
-                "Hit enemies with Yancy Street Charge": {"requirement": 30}
-            },
-            "Knight": {
-                "Block Damage": {"requirement": 25000},
-                "KOs": {"requirement": 35},
-                "Hit enemies with Yancy Street Charge": {"requirement": 75}
-            },
-            "Captain": {
-                "Block Damage": {"requirement": 85000},
-                "KOs": {"requirement": 60},
-                "Hit enemies with Yancy Street Charge": {"requirement": 120}
-            },
-            "Centurion": {
-                "Block Damage": {"requirement": 110000},
-                "KOs": {"requirement": 75},
-                "Hit enemies with Yancy Street Charge": {"requirement": 150}
-            },
-            "Lord": {
-                "Block Damage": {"requirement": 110000},
-                "KOs": {"requirement": 75},
-                "Hit enemies with Yancy Street Charge": {"requirement": 150}
-            }
-        }
+        for char in self.catalog.heroes:
+            if self.catalog.hero_uid(char) in self.completed_characters:
+                self.heroes.set_completed(char, True)
+        self.update_char_combobox()
+        # Even with no character picked, so custom missions have a (character, rank) to belong to
+        self.refresh_missions()
+        self.profiler.mark("ready")
 
-        # Human Torch
-        data["Human Torch"] = {
-            "Agent": {
-                "Reach Damage": {"requirement": 8000},
-                "Final Hits": {"requirement": 8},
-                "Create flame fields with Blazing Blast": {"requirement": 200}
-            },
-            "Knight": {
-                "Reach Damage": {"requirement": 20000},
-                "Final Hits": {"requirement": 20},
-                "Create flame fields with Blazing Blast": {"requirement": 500}
-            },
-            "Captain": {
-                "Reach Damage": {"requirement": 35000},
-                "Final Hits": {"requirement": 35},
-                "Create flame fields with Blazing Blast": {"requirement": 800}
-            },
-            "Centurion": {
-                "Reach Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 40},
-                "Create flame fields with Blazing Blast": {"requirement": 1000}
-            },
-            "Lord": {
-                "Reach Damage": {"requirement": 45000},
-                "Final Hits": {"requirement": 40},
-                "Create flame fields with Blazing Blast": {"requirement": 1000}
-            }
-        }
+    def load_completed(self):
+        # Snapshot plus every toggle journaled since
+        return self.store.load()
 
-        # Set points for all missions based on rank
-        for hero in data:
-            for rank in data[hero]:
-                for mission in data[hero][rank]:
-                    data[hero][rank][mission]["points"] = POINTS_PER_MISSION[rank]
+    def save_completed(self):
+        # Flush queued toggles and fold the journal into a fresh completed.json
+        self.store.compact(wait=True)
 
-        return data
+    def on_close(self):
+        if self.plan_worker is not None:
+            self.plan_worker.close()
+        if self.store is not None:
+            self.save_completed()
+            self.store.close()
+        self.destroy()
 
     def _build_ui(self):
         # Apply initial customization
@@ -1488,6 +240,7 @@ class MarvelRivalsCalculator(tk.Tk):
         self.char_menu.grid(row=3, column=1, columnspan=3, sticky="ew", padx=(5, 0))
         self.char_menu.bind("<<ComboboxSelected>>", self.on_character_selected)
         self.char_menu.bind("<KeyRelease>", self.on_char_search)
+        self.char_menu.bind("<FocusIn>", self._on_char_menu_focus)
 
         # Sort button
         self.sort_button = ttk.Button(frame, text="Sort A-Z", command=self.toggle_sort)
@@ -1587,7 +340,9 @@ class MarvelRivalsCalculator(tk.Tk):
         # Scrollbars
         v_scroll = ttk.Scrollbar(output_frame, orient="vertical", command=self.output.yview)
         h_scroll = ttk.Scrollbar(output_frame, orient="horizontal", command=self.output.xview)
-        self.output.configure(yscrollcommand=v_scroll.set, xscrollcommand=h_scroll.set)
+        self.output.configure(xscrollcommand=h_scroll.set)
+        # Long reports are written in chunks; the renderer also watches the vertical scroll position
+        self.output_renderer = OutputRenderer(self.output, yscrollcommand=v_scroll.set)
 
         # Layout
         self.output.grid(row=0, column=0, sticky="nsew")
@@ -1613,10 +368,14 @@ class MarvelRivalsCalculator(tk.Tk):
         )
         footer_label.pack(side="left")
         footer_label.bind("<Button-1>",
-                          lambda e: webbrowser.open("https://github.com/P13rlU/marvel-rivals-lord-calculator"))
+                          lambda e: self.open_repo_page())
 
         self.apply_theme()
 
+    def open_repo_page(self):
+        import webbrowser  # only needed when the link is clicked
+        webbrowser.open(REPO_URL)
+
     def show_help(self):
         help_text = (
             "Welcome to the Marvel Rivals Lord Rank Calculator!\n\n"
@@ -1630,13 +389,14 @@ class MarvelRivalsCalculator(tk.Tk):
             "Calculating Lord Progress:\n"
             "- Points are earned from missions (varies by rank) and playtime (60 points per hour).\n"
             "- The calculator determines points needed to reach Lord rank based on your current rank and points.\n"
-            "- It estimates the number of missions required, splitting them evenly across listed missions.\n"
+            "- It estimates the number of missions required and spreads them over the listed missions so they finish in as few matches as possible (completed missions are skipped).\n"
             "- Completed characters and missions are marked with a ★ and saved when you close the app.\n\n"
             "Use the Settings menu to customize colors, font, and font size."
         )
         messagebox.showinfo("Help - Marvel Rivals Calculator", help_text)
 
     def change_bg_color(self):
+        from tkinter import colorchooser
         color = colorchooser.askcolor(title="Choose Background Color")[1]
         if color:
             self.bg_color.set(color)
@@ -1646,6 +406,7 @@ class MarvelRivalsCalculator(tk.Tk):
             self.update()
 
     def change_fg_color(self):
+        from tkinter import colorchooser
         color = colorchooser.askcolor(title="Choose Foreground Color")[1]
         if color:
             self.fg_color.set(color)
@@ -1655,6 +416,7 @@ class MarvelRivalsCalculator(tk.Tk):
             self.update()
 
     def change_text_color(self):
+        from tkinter import colorchooser
         color = colorchooser.askcolor(title="Choose Text Color")[1]
         if color:
             self.text_color.set(color)
@@ -1671,7 +433,9 @@ class MarvelRivalsCalculator(tk.Tk):
         font_window.geometry("300x100")
 
         ttk.Label(font_window, text="Select Font:").pack(pady=5)
-        fonts = sorted(list(font.families()))
+        if self._font_families is None:
+            self._font_families = sorted(font.families())
+        fonts = self._font_families
         font_var = tk.StringVar(value=self.font_family.get())
         font_menu = ttk.Combobox(font_window, textvariable=font_var, values=fonts, state="readonly")
         font_menu.pack(pady=5)
@@ -1809,80 +573,106 @@ class MarvelRivalsCalculator(tk.Tk):
         # Update character list with new sort order
         self.update_char_combobox()
 
+    def is_character_completed(self, char):
+        if self.catalog is None:
+            return False
+        return char in self.catalog and self.catalog.hero_uid(char) in self.completed_characters
+
+    def is_row_completed(self, index):
+        name, mission_id = self._row_labels[index][:2]
+        if mission_id is None:
+            return (*self._mission_key, name) in self.completed_custom
+        return mission_id in self.completed_missions
+
+    def set_row_completed(self, index, done):
+        self._completion_revision += 1
+        name, mission_id = self._row_labels[index][:2]
+        # Queued for the background writer, no disk I/O on the Tk thread
+        if mission_id is None:
+            self.store.set_custom(*self._mission_key, name, done)
+        else:
+            self.store.set_mission(mission_id, done)
+
     def toggle_completed(self):
         char = self.current_character.get().replace(" ★", "")
-        if self.completed_check.get():
-            self.completed_characters.add(char)
-        else:
-            self.completed_characters.discard(char)
+        if self.catalog is None or char not in self.catalog:
+            return
+        self.store.set_character(self.catalog.hero_uid(char), self.completed_check.get())
+        self._completion_revision += 1
+        self.heroes.set_completed(char, self.completed_check.get())
         self.update_char_combobox()  # Maintain current sort order
-        self.save_completed()
-        self.refresh_missions()
+        self.show_mission_rows()
 
     def toggle_mission_completed(self):
         selection = self.mission_list.curselection()
         if not selection:
             return
-        index = selection[0]
-        mission_text = self.mission_list.get(index).replace(" ★", "")
-        mission_name = mission_text.split(":")[0].strip()
-        char = self.current_character.get().replace(" ★", "")
-        rank = self.current_mission_rank.get()
-
-        # Ensure mission completion dictionary structure
-        if char not in self.completed_missions:
-            self.completed_missions[char] = {}
-        if rank not in self.completed_missions[char]:
-            self.completed_missions[char][rank] = set()
-
-        if self.mission_completed_check.get():
-            self.completed_missions[char][rank].add(mission_name)
-        else:
-            self.completed_missions[char][rank].discard(mission_name)
-
-        self.save_completed()
-        self.refresh_missions()
+        self.set_row_completed(selection[0], self.mission_completed_check.get())
+        self.show_mission_rows()
 
     def update_mission_check(self, event=None):
         selection = self.mission_list.curselection()
         if not selection:
             self.mission_completed_check.set(False)
             return
-        index = selection[0]
-        mission_text = self.mission_list.get(index).replace(" ★", "")
-        mission_name = mission_text.split(":")[0].strip()
-        char = self.current_character.get().replace(" ★", "")
-        rank = self.current_mission_rank.get()
-
-        is_completed = (char in self.completed_missions and
-                       rank in self.completed_missions[char] and
-                       mission_name in self.completed_missions[char][rank])
-        self.mission_completed_check.set(is_completed)
+        self.mission_completed_check.set(self.is_row_completed(selection[0]))
 
     def refresh_missions(self, event=None):
+        if self.catalog is None:
+            return  # still starting up, _load_data() refreshes once the catalog is in
         char = self.current_character.get().replace(" ★", "")
         rank = self.current_mission_rank.get()
-        self.mission_list.delete(0, tk.END)
-        self.characters = {}
-        self.mission_requirements = {}
 
-        if char in self.mission_data and rank in self.mission_data[char]:
-            for name, info in self.mission_data[char][rank].items():
-                self.characters[name] = info["points"]
-                self.mission_requirements[name] = {"requirement": info["requirement"]}
-                is_completed = (char in self.completed_missions and
-                               rank in self.completed_missions[char] and
-                               name in self.completed_missions[char][rank])
-                formatted_req = f"{info['requirement']:,}"  # Add comma to requirement
-                formatted_points = f"{info['points']:,}"  # Add comma to points
-                display_text = f"{name} ★: Req: {formatted_req} | {formatted_points} pts" if is_completed else f"{name}: Req: {formatted_req} | {formatted_points} pts"
-                self.mission_list.insert(tk.END, display_text)
+        # Rows are only rebuilt when the character or rank changes
+        if (char, rank) != self._mission_key:
+            self._mission_key = (char, rank)
+            self.characters = {}
+            self.mission_requirements = {}
+            self._row_labels = []
+            if char in self.catalog:
+                for slot in self.catalog.slots(char, rank):
+                    name, requirement, points = self.catalog.mission(slot)
+                    self._add_mission_row(name, requirement, points, self.catalog.mission_uids[slot])
+
+        self.show_mission_rows()
 
         # Update character checklist
-        is_completed = char in self.completed_characters
-        self.completed_check.set(is_completed)
+        self.completed_check.set(self.is_character_completed(char))
+
+    def show_mission_rows(self):
+        """Redraw the current rows (e.g. after a completion toggle) without rebuilding them."""
+        self._set_mission_rows([row[3] if self.is_row_completed(index) else row[2]
+                                for index, row in enumerate(self._row_labels)])
+
+    def _add_mission_row(self, name, requirement, points, mission_id=None):
+        self.characters[name] = points
+        self.mission_requirements[name] = {"requirement": requirement}
+        formatted_req = f"{requirement:,}"  # Add comma to requirement
+        formatted_points = f"{points:,}"  # Add comma to points
+        self._row_labels.append((
+            name,
+            mission_id,
+            f"{name}: Req: {formatted_req} | {formatted_points} pts",
+            f"{name} ★: Req: {formatted_req} | {formatted_points} pts",
+        ))
+
+    def _set_mission_rows(self, rows):
+        """Show ``rows`` in the mission list, touching only the rows that changed."""
+        import difflib  # not needed until the first mission list is shown
+        matcher = difflib.SequenceMatcher(None, self.mission_rows, rows, autojunk=False)
+        # Back to front, so earlier indices stay valid
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            if tag == "equal":
+                continue
+            if i2 > i1:
+                self.mission_list.delete(i1, i2 - 1)
+            if j2 > j1:
+                self.mission_list.insert(i1, *rows[j1:j2])
+        self.mission_rows = list(rows)
 
     def add_mission(self):
+        if self._mission_key is None:
+            return  # still starting up
         name = self.mission_name_var.get().strip()
         if not name:
             messagebox.showerror("Error", "Mission must have a name")
@@ -1894,13 +684,14 @@ class MarvelRivalsCalculator(tk.Tk):
         except ValueError:
             messagebox.showerror("Error", "Requirement and points must be numbers")
             return
+        if req <= 0 or points <= 0:
+            messagebox.showerror("Error", "Requirement and points must be greater than zero")
+            return
 
-        self.characters[name] = points
-        self.mission_requirements[name] = {"requirement": req}
-
-        formatted_req = f"{req:,}"  # Add comma to requirement
-        formatted_points = f"{points:,}"  # Add comma to points
-        self.mission_list.insert(tk.END, f"{name}: Req: {formatted_req} | {formatted_points} pts")
+        # Appended to the rows on screen; refresh_missions() would rebuild them if the
+        # character box holds search text instead of the character they belong to
+        self._add_mission_row(name, req, points)
+        self.show_mission_rows()
 
         # Clear inputs
         self.mission_name_var.set("")
@@ -1912,8 +703,7 @@ class MarvelRivalsCalculator(tk.Tk):
         if not selection:
             return
         index = selection[0]
-        mission_text = self.mission_list.get(index).replace(" ★", "")
-        mission_name = mission_text.split(":")[0].strip()
+        mission_name = self._row_labels[index][0]
 
         if mission_name in self.characters:
             del self.characters[mission_name]
@@ -1921,22 +711,24 @@ class MarvelRivalsCalculator(tk.Tk):
             del self.mission_requirements[mission_name]
 
         # Remove from completed missions
-        char = self.current_character.get().replace(" ★", "")
-        rank = self.current_mission_rank.get()
-        if char in self.completed_missions and rank in self.completed_missions[char]:
-            self.completed_missions[char][rank].discard(mission_name)
-            self.save_completed()
+        if self.is_row_completed(index):
+            self.set_row_completed(index, False)
 
+        del self._row_labels[index]
+        del self.mission_rows[index]
         self.mission_list.delete(index)
 
     def _set_output_text(self, text: str):
         """Safely update the output widget text (readonly)."""
-        self.output.config(state="normal")
-        self.output.delete(1.0, tk.END)
-        self.output.insert(tk.END, text)
-        self.output.config(state="disabled")
+        self.output_renderer.render_text(text)
+
+    def _set_output_lines(self, lines):
+        """Like ``_set_output_text``, without joining the lines first."""
+        self.output_renderer.render(lines)
 
     def calculate(self):
+        if self.catalog is None:
+            return  # still starting up
         try:
             current_rank = self.current_rank_var.get()
             target_rank = self.current_mission_rank.get()  # ← use mission rank as target
@@ -1946,71 +738,37 @@ class MarvelRivalsCalculator(tk.Tk):
             messagebox.showerror("Error", "Points and hours must be numbers")
             return
 
-        # Validation: target rank must be higher than current rank
-        ranks = list(RANK_THRESHOLDS.keys())
-        try:
-            current_index = ranks.index(current_rank)
-            target_index = ranks.index(target_rank)
-        except ValueError:
-            messagebox.showerror("Error", "Invalid rank selected")
-            return
-
-        if target_index <= current_index:
-            messagebox.showerror("Error", "Target rank must be higher than current rank")
-            return
-
-        # Calculate points needed
-        points_to_target = 0
-        for i in range(current_index, target_index):
-            rank = ranks[i]
-            if i == current_index:
-                # Remaining points for current rank
-                points_to_target += max(0, RANK_THRESHOLDS[rank] - current_points)
-            else:
-                # Total points for intermediate ranks
-                points_to_target += RANK_THRESHOLDS[rank]
-
-        play_points = hours_played * 60
-        remaining = max(0, points_to_target - play_points)
-        mission_points = POINTS_PER_MISSION[target_rank] if self.characters else 40
-        total_missions = math.ceil(remaining / mission_points) if remaining > 0 else 0
-
-        # Build output
         char = self.current_character.get().replace(" ★", "")
-        star = "★" if char in self.completed_characters else ""
-        output_lines = []
-        output_lines.append(f"Character: {char} {star}")
-        output_lines.append(f"Playtime points: {play_points:,}")
-        output_lines.append(f"Points still needed to {target_rank}: {remaining:,}")  # ← Show correct target
-        output_lines.append(f"Total missions required (at {mission_points:,} pts each): {total_missions:,}")
-        output_lines.append("")  # Empty line
-
-        if not self.characters:
-            output_lines.append("No missions added yet.")
-        else:
-            split = 1 / len(self.characters) if len(self.characters) > 0 else 0
-            for name, points in self.characters.items():
-                num_missions = math.ceil(total_missions * split)
-                data = self.mission_requirements.get(name, {})
-                req = data.get("requirement")
-                is_completed = (char in self.completed_missions and
-                                target_rank in self.completed_missions[char] and
-                                name in self.completed_missions[char][target_rank])
-                star = "★" if is_completed else ""
-                formatted_points = f"{points * num_missions:,}"
-                output_lines.append(f"{name} {star}: {num_missions:,} missions ({formatted_points} pts)")
-                if req:
-                    total_req = num_missions * req
-                    formatted_req = f"{total_req:,}"
-                    output_lines.append(f"  → {formatted_req} required")
-                output_lines.append("")  # Empty line after each mission
-
-        output_text = "\n".join(output_lines)
-        self._set_output_text(output_text)
+        missions = {
+            name: {"points": points, "requirement": self.mission_requirements.get(name, {}).get("requirement")}
+            for name, points in self.characters.items()
+        }
+        self.plan_cache.set_generation((id(self.catalog), self._completion_revision))
+        # Everything the job needs is copied here; the worker never touches Tk state
+        self.plan_worker.submit(self._timed_plan, current_rank, current_points, hours_played, target_rank,
+                                missions=missions,
+                                character=char,
+                                completed={row[0] for index, row in enumerate(self._row_labels)
+                                           if self.is_row_completed(index)},
+                                character_completed=self.is_character_completed(char))
+        if self._plan_poll is None:
+            self._plan_poll = self.after(PLAN_POLL_MS, self._poll_plan)
+
+    def _poll_plan(self):
+        from planner import PlanError  # loaded with the data by now
+        self._plan_poll = None
+        for result in self.plan_worker.poll():
+            if isinstance(result.error, PlanError):
+                messagebox.showerror("Error", str(result.error))
+            elif result.error is not None:
+                messagebox.showerror("Error", f"Calculation failed: {result.error}")
+            else:
+                self._set_output_lines(result.value.lines())
+        if self.plan_worker.busy:
+            self._plan_poll = self.after(PLAN_POLL_MS, self._poll_plan)
 
     def on_filter_change(self, event=None):
         # Reset search and update character list
-        self._full_character_list = None  # Reset cache
         self.update_char_combobox()
 
     def on_char_search(self, event=None):
@@ -2020,11 +778,41 @@ class MarvelRivalsCalculator(tk.Tk):
         if self._updating_combobox:
             return
 
+        # Replace any search still waiting; latency counts from the first unserved keystroke
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        else:
+            self._search_started = time.perf_counter()
+        self._search_generation += 1
+        self._search_job = self.after(SEARCH_DELAY_MS, self._run_char_search, self._search_generation)
+
+    def _run_char_search(self, generation):
+        self._search_job = None
+        if generation != self._search_generation:
+            return  # a newer keystroke owns the search
+
         current_text = self.current_character.get().lower().strip()
         self.update_char_combobox(search_term=current_text)
+        self.search_latencies.append(time.perf_counter() - self._search_started)
 
-        #
-        self.after(300, lambda: self._open_combobox_popup())
+        if not self._popup_open:
+            self._open_combobox_popup()
+
+    def search_latency_stats(self):
+        """Keystroke-to-results latency in ms: count, p50, p95 and max."""
+        latencies = sorted(self.search_latencies)
+        if not latencies:
+            return {"count": 0}
+        return {
+            "count": len(latencies),
+            "p50": latencies[len(latencies) // 2] * 1000,
+            "p95": latencies[int(len(latencies) * 0.95)] * 1000,
+            "max": latencies[-1] * 1000,
+        }
+
+    def _on_char_menu_focus(self, event=None):
+        # Focus comes back to the entry once the dropdown has closed
+        self._popup_open = False
 
     def _open_combobox_popup(self):
         if not self.char_menu.winfo_viewable():
@@ -2033,6 +821,7 @@ class MarvelRivalsCalculator(tk.Tk):
             # cross-platform way to open the dropdown
             self.char_menu.event_generate("<Button-1>")
             self.char_menu.event_generate("<ButtonRelease-1>")
+            self._popup_open = True
         except Exception:
             pass
 
@@ -2040,51 +829,66 @@ class MarvelRivalsCalculator(tk.Tk):
         # When a character is selected reload missions
         char = self.current_character.get().replace(" ★", "")
         # Assicurati che sia un personaggio valido (non testo casuale)
-        if char in self._get_all_characters():
+        if char in self.heroes:
             self.refresh_missions()
             self.char_menu.select_clear()
         else:
             # If something invalid was typed, reset to previous valid selection
             pass
 
-    def _get_all_characters(self):
-        # Cache all characters
-        chars = []
-        for role in self.roles.values():
-            chars.extend(role)
-        return set(chars)
-
     def update_char_combobox(self, search_term=""):
         if self._updating_combobox:
             return
         self._updating_combobox = True
 
         filter_role = self.filter_var.get()
-        characters = []
-
-        for role, heros in self.roles.items():
-            if filter_role == "All" or filter_role == role:
-                characters.extend(heros)
 
         if search_term:
-            characters = [c for c in characters if search_term in c.lower()]
-
-        characters.sort(reverse=not self.sort_ascending.get())
-
-        display_chars = []
-        for char in characters:
-            if char in self.completed_characters:
-                display_chars.append(f"{char} ★")
-            else:
-                display_chars.append(char)
+            # Fuzzy matches, best first
+            display_chars = [self.heroes.label(char)
+                             for char in self.search_index.search(search_term, role=filter_role)]
+            shown = None
+        else:
+            # Pre-sorted view, stars already applied
+            display_chars = self.heroes.labels(filter_role, self.sort_ascending.get())
+            shown = (filter_role, self.sort_ascending.get(), self.heroes.version)
 
-        current_input = self.current_character.get()
-        self.char_menu["values"] = display_chars
-        self.current_character.set(current_input)
-        self.char_menu.icursor(tk.END)
+        if shown is None or shown != self._shown_characters:
+            current_input = self.current_character.get()
+            self.char_menu["values"] = display_chars
+            self.current_character.set(current_input)
+            self.char_menu.icursor(tk.END)
+        self._shown_characters = shown
 
         self._updating_combobox = False
 
 if __name__ == "__main__":
-    app = MarvelRivalsCalculator()
-    app.mainloop()
\ No newline at end of file
+    # Command-line modes (e.g. "plan --input players.jsonl") never create a window
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+        from cli import main
+        sys.exit(main(sys.argv[1:]))
+
+    # --timing / --cprofile PATH, or RIVALS_CALC_TIMING / RIVALS_CALC_CPROFILE
+    profiler = Profiler.from_environment(sys.argv)
+    profiler.start()
+    app = MarvelRivalsCalculator(profiler=profiler)
+    # --stalls or RIVALS_CALC_STALLS: log every handler that blocks the event loop
+    stall_monitor = StallMonitor.from_environment(app, sys.argv)
+    if stall_monitor is not None:
+        stall_monitor.track(app, "save_completed", "refresh_missions", "update_char_combobox", "calculate",
+                            "apply_theme", "update")
+        stall_monitor.start()
+    app.mainloop()
+    profiler.finish()
+    if profiler.enabled:
+        if app.plan_cache is not None:
+            print(f"Plan cache: {app.plan_cache.stats}", file=sys.stderr)
+        search = app.search_latency_stats()
+        if search["count"]:
+            print(f"Search latency (keystroke → results): {search['count']} searches, p50 {search['p50']:.1f} ms,"
+                  f" p95 {search['p95']:.1f} ms, max {search['max']:.1f} ms", file=sys.stderr)
+        else:
+            print("Search latency (keystroke → results): no searches", file=sys.stderr)
+    if stall_monitor is not None:
+        stall_monitor.stop()
+        print(stall_monitor.report(), file=sys.stderr)
\ No newline at end of file
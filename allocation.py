@@ -0,0 +1,112 @@
+"""Mission allocation solver.
+
+Decides how many times to complete each listed mission so the plan's mission
+count is reached in the fewest expected matches. All missions of a hero
+progress together during a match, so after ``m`` matches mission ``i`` has been
+completed ``floor(m * rate_i / requirement_i)`` times; the solver looks for the
+smallest ``m`` whose completions add up to the target.
+"""
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+# Expected amount of each stat gained in one match
+MATCH_RATES = {
+    "damage": 12000,
+    "heal": 12000,
+    "block": 12000,
+    "kos_assists": 18,
+    "kos": 10,
+    "final_hits": 8,
+}
+
+# Hero-specific ability missions have no common stat: assume one completion
+# takes this many matches at any rank
+ABILITY_MATCHES_PER_MISSION = 4
+
+_STAT_NAMES = {
+    "deal damage": "damage",
+    "reach damage": "damage",
+    "heal damage": "heal",
+    "reach healing": "heal",
+    "block damage": "block",
+    "kos/assists": "kos_assists",
+    "achieve kos/assists": "kos_assists",
+    "kos": "kos",
+    "achieve kos": "kos",
+    "final hits": "final_hits",
+    "land final hits": "final_hits",
+    "achieve final hits": "final_hits",
+}
+
+
+class MissionInput(NamedTuple):
+    name: str
+    requirement: Optional[int]
+    # Expected stat per match; None uses the default for the mission's stat
+    rate: Optional[float] = None
+
+
+class Allocation(NamedTuple):
+    matches: int
+    counts: Tuple[int, ...]
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+
+def mission_stat(name: str) -> str:
+    """Stat a mission tracks (``"damage"``, ``"kos"``...), or ``"ability"``."""
+    return _STAT_NAMES.get(name.strip().lower(), "ability")
+
+
+def match_rate(name: str, requirement: Optional[int]) -> Optional[float]:
+    """Default expected progress per match for a mission."""
+    rate = MATCH_RATES.get(mission_stat(name))
+    if rate is None and requirement:
+        rate = requirement / ABILITY_MATCHES_PER_MISSION
+    return rate
+
+
+def matches_per_completion(mission: MissionInput) -> float:
+    # A missing or non-positive requirement (e.g. a mistyped custom mission) counts as one match
+    if not mission.requirement or mission.requirement <= 0:
+        return 1.0
+    rate = mission.rate if mission.rate is not None else match_rate(mission.name, mission.requirement)
+    if not rate or rate <= 0:
+        return float(ABILITY_MATCHES_PER_MISSION)
+    return mission.requirement / rate
+
+
+@lru_cache(maxsize=4096)
+def _solve(target: int, costs: Tuple[float, ...]):
+    def completions(matches):
+        # Small epsilon so exact multiples are not lost to float rounding
+        return [int(matches / cost + 1e-9) for cost in costs]
+
+    # Doing only the cheapest mission is always enough
+    high = max(1, int(-(-target * min(costs) // 1)))
+    while sum(completions(high)) < target:
+        high *= 2
+    low = 0
+    while low < high:
+        middle = (low + high) // 2
+        if sum(completions(middle)) >= target:
+            high = middle
+        else:
+            low = middle + 1
+    return low, tuple(completions(low))
+
+
+def allocate(target: int, missions) -> Allocation:
+    """Split ``target`` mission completions over ``missions`` (:class:`MissionInput`).
+
+    Results are memoized on the normalized input signature, so re-planning the
+    same hero on every click is a cache hit.
+    """
+    missions = tuple(missions)
+    if target <= 0 or not missions:
+        return Allocation(matches=0, counts=(0,) * len(missions))
+    costs = tuple(matches_per_completion(mission) for mission in missions)
+    matches, counts = _solve(target, costs)
+    return Allocation(matches=matches, counts=counts)
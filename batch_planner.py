@@ -0,0 +1,107 @@
+"""Vectorized planning over whole arrays of player states.
+
+This is the batch counterpart of :func:`planner.plan`: instead of one player
+state it takes NumPy arrays of rank indices (positions in ``planner.RANKS``),
+points, hours and targets, and computes every row in a single pass. NumPy is
+only needed for this module, the GUI does not import it.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from planner import RANK_INDEX, POINTS_PER_HOUR
+
+_THRESHOLDS = np.array(RANK_INDEX.thresholds, dtype=np.int64)
+_MISSION_POINTS = np.array(RANK_INDEX.mission_points, dtype=np.int64)
+# Points needed from the start of Agent to the start of each rank
+_RANK_START = np.array(RANK_INDEX.starts, dtype=np.int64)
+
+
+class BatchPlan(NamedTuple):
+    remaining: np.ndarray
+    missions: np.ndarray
+    # False where the row could not be planned (unknown rank or target not above current)
+    valid: np.ndarray
+
+
+def plan_batch(current_rank, current_points, hours_played, target_rank) -> BatchPlan:
+    """Plan every row of the given arrays at once.
+
+    Matches :func:`planner.plan` row by row: the remaining points after
+    playtime, and the missions needed when every rank passed through is priced
+    at its own points per mission. Invalid rows get ``0`` in both result arrays.
+    """
+    current_rank = np.asarray(current_rank, dtype=np.int64)
+    target_rank = np.asarray(target_rank, dtype=np.int64)
+    current_points = np.asarray(current_points, dtype=np.int64)
+    hours_played = np.asarray(hours_played, dtype=np.int64)
+
+    last = RANK_INDEX.last
+    valid = (current_rank >= 0) & (target_rank <= last) & (target_rank > current_rank)
+    current = np.clip(current_rank, 0, last)
+    target = np.clip(target_rank, 0, last)
+
+    play_points = hours_played * POINTS_PER_HOUR
+    absolute = absolute_batch(current, current_points)
+    remaining = np.maximum(0, _RANK_START[target] - absolute - play_points)
+
+    # One closed-form step per rank, in ladder order, with the carry-over
+    # of each rank's last mission feeding the next one
+    absolute = absolute + play_points
+    missions = np.zeros_like(absolute)
+    for rank in range(last):
+        rows = (locate_batch(absolute)[0] == rank) & (rank < target)
+        value = _MISSION_POINTS[rank]
+        count = np.where(rows, -(-(_RANK_START[rank + 1] - absolute) // value), 0)
+        missions += count
+        absolute += count * value
+
+    remaining = np.where(valid, remaining, 0)
+    missions = np.where(valid, missions, 0)
+    return BatchPlan(remaining=remaining, missions=missions, valid=valid)
+
+
+def locate_batch(absolute):
+    """Vectorized :meth:`planner.RankIndex.locate`: arrays of ``(rank, points)``."""
+    absolute = np.asarray(absolute, dtype=np.int64)
+    rank = np.maximum(np.searchsorted(_RANK_START, absolute, side="right") - 1, 0)
+    return rank, absolute - _RANK_START[rank]
+
+
+def absolute_batch(rank, points):
+    """Vectorized :meth:`planner.RankIndex.absolute`."""
+    rank = np.asarray(rank, dtype=np.int64)
+    return _RANK_START[rank] + np.minimum(np.asarray(points, dtype=np.int64), _THRESHOLDS[rank])
+
+
+def after_points_batch(rank, points, earned):
+    """Vectorized :meth:`planner.RankIndex.after_points`."""
+    return locate_batch(absolute_batch(rank, points) + np.asarray(earned, dtype=np.int64))
+
+
+def after_missions_batch(rank, points, missions):
+    """Vectorized :meth:`planner.RankIndex.after_missions`.
+
+    Every row advances at most one rank per pass, so this loops once per rank
+    regardless of the number of rows or missions.
+    """
+    absolute = absolute_batch(rank, points)
+    missions = np.array(missions, dtype=np.int64)
+    rank = locate_batch(absolute)[0]
+    last = RANK_INDEX.last
+
+    for _ in range(last):
+        active = (missions > 0) & (rank < last)
+        if not active.any():
+            break
+        value = _MISSION_POINTS[rank]
+        to_next = _RANK_START[np.minimum(rank + 1, last)] - absolute
+        needed = -(-to_next // value)
+        # Rows that stay inside their rank spend all of their missions here
+        spent = np.where(missions < needed, missions, needed)
+        spent = np.where(active, spent, 0)
+        absolute = absolute + spent * value
+        missions = missions - spent
+        rank = locate_batch(absolute)[0]
+
+    return locate_batch(absolute + missions * _MISSION_POINTS[rank])
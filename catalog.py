@@ -0,0 +1,370 @@
+"""Columnar mission catalog.
+
+The catalog stores every (hero, rank, mission) row in parallel arrays instead
+of nested dicts. Hero and mission names are interned once in string tables and
+rows refer to them by id, so the per-row cost is a handful of bytes no matter
+how many heroes are added. Rows are sorted by hero and rank, and an offsets
+table gives the slice of rows for any (hero, rank) pair in O(1).
+
+The catalog ships as ``missions.json`` and is compiled to ``missions.bin``, a
+binary image of the same columns. Loading the binary form memory-maps the file
+and casts the columns in place, so startup does not depend on catalog size;
+names are only decoded when a hero's missions are first looked up.
+
+Every hero and mission also carries a stable integer id from ``missions.json``.
+Names can be fixed or translated without breaking saved progress, which refers
+to heroes and missions by id only.
+
+Compile by hand with::
+
+    python catalog.py missions.json missions.bin
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import NamedTuple
+
+from ranks import RANKS, POINTS_PER_MISSION
+
+_RANK_IDS = {rank: i for i, rank in enumerate(RANKS)}
+
+CATALOG_SOURCE = "missions.json"
+CATALOG_BINARY = "missions.bin"
+
+# magic, format version, ranks, heroes, mission names, rows
+_HEADER = struct.Struct("<4sHHIII")
+_MAGIC = b"MRCT"
+_FORMAT_VERSION = 2
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog file is malformed or does not match this version."""
+
+
+class Mission(NamedTuple):
+    name: str
+    requirement: int
+    points: int
+
+
+class LazyStrings(Sequence):
+    """UTF-8 string table that decodes (and interns) each entry on first access."""
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+        self._cache = [None] * (len(offsets) - 1)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = self._cache[index]
+        if value is None:
+            if index < 0:
+                index += len(self)
+            raw = bytes(self._blob[self._offsets[index]:self._offsets[index + 1]])
+            value = self._cache[index] = sys.intern(raw.decode("utf-8"))
+        return value
+
+
+class MissionCatalog:
+    def __init__(self, heroes, mission_names, hero_ids, rank_ids, mission_ids, requirements, points, offsets,
+                 hero_uids, mission_uids, buffer=None):
+        # String tables
+        self.heroes = heroes
+        self.mission_names = mission_names
+        # Row columns, all the same length
+        self.hero_ids = hero_ids
+        self.rank_ids = rank_ids
+        self.mission_ids = mission_ids
+        self.requirements = requirements
+        self.points = points
+        # offsets[hero_id * len(RANKS) + rank_id] is the first row of that pair
+        self.offsets = offsets
+        # Stable ids from missions.json, per hero and per row
+        self.hero_uids = hero_uids
+        self.mission_uids = mission_uids
+        self._hero_index = None
+        self._hero_uid_index = None
+        self._slot_index = None
+        # Keeps the mapped file alive while the columns point into it
+        self._buffer = buffer
+
+    @classmethod
+    def from_nested(cls, data, hero_uids=None):
+        """Build a catalog from ``{hero: {rank: {mission: {"requirement": ..., "points": ..., "id": ...}}}}``.
+
+        ``hero_uids`` maps hero names to their ids. Heroes and missions without
+        an id get one derived from their position, ``hero * 100 + rank * 10 + n``.
+        """
+        heroes = [sys.intern(hero) for hero in sorted(data)]
+        hero_uids = hero_uids or {}
+        mission_names = []
+        mission_index = {}
+        hero_ids = array("H")
+        rank_ids = array("B")
+        mission_ids = array("H")
+        requirements = array("I")
+        points = array("H")
+        offsets = array("I", [0])
+        hero_uid_column = array("I")
+        mission_uid_column = array("I")
+
+        for hero_id, hero in enumerate(heroes):
+            hero_uid = hero_uids.get(hero, hero_id + 1)
+            hero_uid_column.append(hero_uid)
+            for rank_id, rank in enumerate(RANKS):
+                for n, (name, info) in enumerate(data[hero].get(rank, {}).items()):
+                    mission_id = mission_index.get(name)
+                    if mission_id is None:
+                        mission_id = mission_index[name] = len(mission_names)
+                        mission_names.append(sys.intern(name))
+                    hero_ids.append(hero_id)
+                    rank_ids.append(rank_id)
+                    mission_ids.append(mission_id)
+                    requirements.append(info["requirement"])
+                    points.append(info.get("points", POINTS_PER_MISSION[rank]))
+                    mission_uid_column.append(info.get("id", hero_uid * 100 + rank_id * 10 + n))
+                offsets.append(len(hero_ids))
+
+        if len(set(hero_uid_column)) != len(hero_uid_column):
+            raise CatalogError("Duplicate hero id in catalog")
+        if len(set(mission_uid_column)) != len(mission_uid_column):
+            raise CatalogError("Duplicate mission id in catalog")
+        return cls(heroes, mission_names, hero_ids, rank_ids, mission_ids, requirements, points, offsets,
+                   hero_uid_column, mission_uid_column)
+
+    @classmethod
+    def from_source(cls, doc):
+        """Build a catalog from the parsed ``missions.json`` document."""
+        data = {}
+        hero_uids = {}
+        for hero in doc["heroes"]:
+            data[hero["name"]] = {
+                rank: {mission["name"]: mission for mission in missions}
+                for rank, missions in hero["missions"].items()
+            }
+            if "id" in hero:
+                hero_uids[hero["name"]] = hero["id"]
+        return cls.from_nested(data, hero_uids)
+
+    def _index(self):
+        if self._hero_index is None:
+            self._hero_index = {name: i for i, name in enumerate(self.heroes)}
+        return self._hero_index
+
+    def __len__(self):
+        return len(self.hero_ids)
+
+    def __contains__(self, hero):
+        return hero in self._index()
+
+    def hero_id(self, hero):
+        return self._index()[hero]
+
+    def hero_uid(self, hero):
+        """Stable id of ``hero``."""
+        return self.hero_uids[self._index()[hero]]
+
+    def hero_for_uid(self, uid):
+        """Hero name for a stable hero id, or ``None`` if it is not in the catalog."""
+        if self._hero_uid_index is None:
+            self._hero_uid_index = {hero_uid: i for i, hero_uid in enumerate(self.hero_uids)}
+        index = self._hero_uid_index.get(uid)
+        return None if index is None else self.heroes[index]
+
+    def slot_for_uid(self, uid):
+        """Row index of a stable mission id, or ``None`` if it is not in the catalog."""
+        if self._slot_index is None:
+            self._slot_index = {mission_uid: slot for slot, mission_uid in enumerate(self.mission_uids)}
+        return self._slot_index.get(uid)
+
+    def mission_uid(self, hero, rank, name):
+        """Stable id of the mission called ``name`` for ``hero`` at ``rank``, or ``None``."""
+        for slot in self.slots(hero, rank):
+            if self.mission_names[self.mission_ids[slot]] == name:
+                return self.mission_uids[slot]
+        return None
+
+    def slots(self, hero, rank):
+        """Row indices of the missions for ``hero`` at ``rank``."""
+        key = self._index()[hero] * len(RANKS) + _RANK_IDS[rank]
+        return range(self.offsets[key], self.offsets[key + 1])
+
+    def mission(self, slot):
+        return Mission(self.mission_names[self.mission_ids[slot]], self.requirements[slot], self.points[slot])
+
+    def missions(self, hero, rank):
+        """List of :class:`Mission` for ``hero`` at ``rank``."""
+        return [self.mission(slot) for slot in self.slots(hero, rank)]
+
+    def mission_data(self, hero, rank):
+        """``{mission: {"points": ..., "requirement": ...}}`` for ``hero`` at ``rank``, as :func:`planner.plan` takes it."""
+        return {name: {"points": points, "requirement": requirement}
+                for name, requirement, points in self.missions(hero, rank)}
+
+    def rows(self):
+        """Iterate ``(hero, rank, Mission)`` over the whole catalog."""
+        for slot in range(len(self)):
+            yield self.heroes[self.hero_ids[slot]], RANKS[self.rank_ids[slot]], self.mission(slot)
+
+
+def _pad(data, size=4):
+    return data + b"\0" * (-len(data) % size)
+
+
+def _column(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def dump_catalog(catalog):
+    """Serialize ``catalog`` to the binary ``missions.bin`` layout."""
+    strings = [name.encode("utf-8") for name in list(catalog.heroes) + list(catalog.mission_names)]
+    string_offsets = [0]
+    for raw in strings:
+        string_offsets.append(string_offsets[-1] + len(raw))
+
+    # Widest columns first so every section stays aligned to its item size
+    sections = [
+        _HEADER.pack(_MAGIC, _FORMAT_VERSION, len(RANKS), len(catalog.heroes),
+                     len(catalog.mission_names), len(catalog)),
+        _column("I", string_offsets),
+        _column("I", catalog.offsets),
+        _column("I", catalog.requirements),
+        _column("I", catalog.hero_uids),
+        _column("I", catalog.mission_uids),
+        _column("H", catalog.hero_ids),
+        _column("H", catalog.mission_ids),
+        _column("H", catalog.points),
+        _pad(_column("B", catalog.rank_ids)),
+        b"".join(strings),
+    ]
+    return b"".join(sections)
+
+
+def load_catalog_buffer(buffer):
+    """Open a catalog over a ``missions.bin`` image without copying the columns."""
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise CatalogError("Catalog file is truncated")
+    magic, version, n_ranks, n_heroes, n_names, n_rows = _HEADER.unpack_from(view)
+    if magic != _MAGIC or version != _FORMAT_VERSION:
+        raise CatalogError("Unsupported catalog file")
+    if n_ranks != len(RANKS):
+        raise CatalogError("Catalog was compiled for a different rank list")
+
+    position = _HEADER.size
+
+    def take(typecode, count):
+        nonlocal position
+        size = array(typecode).itemsize * count
+        chunk = view[position:position + size]
+        if len(chunk) != size:
+            raise CatalogError("Catalog file is truncated")
+        position += size
+        if sys.byteorder != "little":
+            column = array(typecode, chunk.tobytes())
+            column.byteswap()
+            return column
+        return chunk.cast(typecode)
+
+    string_offsets = take("I", n_heroes + n_names + 1)
+    offsets = take("I", n_heroes * n_ranks + 1)
+    requirements = take("I", n_rows)
+    hero_uids = take("I", n_heroes)
+    mission_uids = take("I", n_rows)
+    hero_ids = take("H", n_rows)
+    mission_ids = take("H", n_rows)
+    points = take("H", n_rows)
+    rank_ids = take("B", n_rows)
+    position += -n_rows % 4
+    blob = view[position:]
+
+    heroes = LazyStrings(blob, string_offsets[:n_heroes + 1])
+    mission_names = LazyStrings(blob, string_offsets[n_heroes:])
+    return MissionCatalog(heroes, mission_names, hero_ids, rank_ids, mission_ids, requirements, points, offsets,
+                          hero_uids, mission_uids, buffer=buffer)
+
+
+def load_catalog_file(path):
+    """Memory-map ``path`` (a compiled ``missions.bin``) and open it."""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return load_catalog_buffer(buffer)
+
+
+def compile_catalog(source_path, target_path=None):
+    """Compile a ``missions.json`` source into its binary form.
+
+    Writes ``target_path`` atomically when given and returns the binary image.
+    """
+    import json  # only needed when the binary is out of date
+
+    with open(source_path, "r", encoding="utf-8") as f:
+        data = dump_catalog(MissionCatalog.from_source(json.load(f)))
+    if target_path:
+        temp_path = target_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, target_path)
+    return data
+
+
+def catalog_dirs():
+    """Directories searched for the catalog, most specific first.
+
+    A ``missions.json``/``missions.bin`` dropped next to the executable (or the
+    script) overrides the copy bundled into a PyInstaller build.
+    """
+    if getattr(sys, "frozen", False):
+        dirs = [os.path.dirname(sys.executable), getattr(sys, "_MEIPASS", "")]
+    else:
+        dirs = [os.path.dirname(os.path.abspath(__file__))]
+    return [d for d in dirs if d]
+
+
+def load_catalog():
+    """Load the first catalog found in :func:`catalog_dirs`.
+
+    A compiled ``missions.bin`` is used as long as it is not older than the
+    ``missions.json`` beside it (and was compiled by this version); otherwise
+    the source is recompiled first.
+    """
+    for directory in catalog_dirs():
+        source = os.path.join(directory, CATALOG_SOURCE)
+        binary = os.path.join(directory, CATALOG_BINARY)
+        has_source = os.path.exists(source)
+        if os.path.exists(binary) and (not has_source or os.path.getmtime(binary) >= os.path.getmtime(source)):
+            try:
+                return load_catalog_file(binary)
+            except CatalogError:
+                # Left over from an older build: recompile it below
+                if not has_source:
+                    raise
+        if has_source:
+            try:
+                compile_catalog(source, binary)
+            except OSError:
+                # Read-only install: keep the compiled image in memory instead
+                return load_catalog_buffer(compile_catalog(source))
+            return load_catalog_file(binary)
+    raise FileNotFoundError(f"No {CATALOG_SOURCE} or {CATALOG_BINARY} found")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile missions.json into missions.bin")
+    parser.add_argument("source", nargs="?", default=CATALOG_SOURCE)
+    parser.add_argument("target", nargs="?", default=CATALOG_BINARY)
+    args = parser.parse_args()
+    compile_catalog(args.source, args.target)
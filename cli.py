@@ -0,0 +1,214 @@
+"""Command-line modes of the calculator.
+
+``plan`` reads player states one row at a time from a JSONL or CSV file and
+writes one plan per row, so memory use does not depend on the size of the
+input::
+
+    python RivalsCalculateLord.py plan --input players.jsonl --output plans.csv
+
+``serve`` runs the HTTP planning service from :mod:`server`.
+
+Each row needs ``rank``, ``points``, ``hours`` and ``target``; ``hero`` is
+optional and plans that hero's missions for the target rank. Rows that cannot
+be planned are written with an ``error`` field instead of stopping the run.
+"""
+import argparse
+import csv
+import json
+import sys
+
+from catalog import load_catalog
+from planner import PlanCache, PlanError, plan, rank_index
+
+FORMATS = ("jsonl", "csv")
+
+# Accepted spellings of each input field
+_FIELDS = {
+    "rank": ("rank", "current_rank"),
+    "points": ("points", "current_points"),
+    "hours": ("hours", "hours_played"),
+    "target": ("target", "target_rank"),
+    "hero": ("hero", "character"),
+}
+
+# What a bad row can raise from normalize_row() and plan_row()
+ROW_ERRORS = (PlanError, ValueError, TypeError)
+
+CSV_COLUMNS = ("hero", "current_rank", "target_rank", "play_points", "points_to_target", "remaining",
+               "total_missions", "matches", "missions", "error")
+
+
+def _format_for(path, default="jsonl"):
+    if path and path != "-" and path.lower().endswith(".csv"):
+        return "csv"
+    return default
+
+
+def _field(row, name):
+    for key in _FIELDS[name]:
+        value = row.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def read_rows(f, fmt):
+    """Yield input rows one at a time, unparsed: dicts for CSV, text lines for JSONL."""
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+        return
+    for line in f:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def parse_row(row):
+    """The dict for one row from :func:`read_rows`; raises ``ValueError`` for anything else."""
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON: {e}") from None
+    if not isinstance(row, dict):
+        raise ValueError("Expected a JSON object")
+    return row
+
+
+def _int_field(row, name):
+    try:
+        return int(_field(row, name) or 0)
+    except OverflowError:
+        # int() of an infinite float, e.g. 1e999 in JSON
+        raise ValueError(f"{name} is out of range") from None
+
+
+def normalize_row(row):
+    """``(rank, points, hours, target, hero)`` of an input row, with defaults filled in."""
+    return (_field(row, "rank") or "Agent", _int_field(row, "points"), _int_field(row, "hours"),
+            _field(row, "target") or "Lord", _field(row, "hero") or "")
+
+
+def plan_row(row, catalog=None, cache=None):
+    """Plan one input row; raises :class:`planner.PlanError` or ``ValueError`` for bad rows.
+
+    With a :class:`planner.PlanCache`, repeated player states are answered from it.
+    """
+    rank, points, hours, target, hero = normalize_row(row)
+    # Ranks are checked before they are used to look up the hero's missions
+    rank_index(rank)
+    rank_index(target)
+    missions = None
+    if hero:
+        if catalog is None or hero not in catalog:
+            raise PlanError(f"Unknown hero: {hero}")
+        missions = catalog.mission_data(hero, target)
+    return (cache.plan if cache is not None else plan)(rank, points, hours, target, missions=missions,
+                                                        character=hero)
+
+
+class JsonlWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, result, row, error=None):
+        if error is not None:
+            record = {"input": row, "error": error}
+        else:
+            record = result.to_dict()
+        self.f.write(json.dumps(record) + "\n")
+
+
+class CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, result, row, error=None):
+        if error is not None:
+            hero = _field(row, "hero") if isinstance(row, dict) else None
+            self.writer.writerow({"hero": hero or "", "error": error})
+            return
+        self.writer.writerow({
+            "hero": result.character,
+            "current_rank": result.current_rank,
+            "target_rank": result.target_rank,
+            "play_points": result.play_points,
+            "points_to_target": result.points_to_target,
+            "remaining": result.remaining,
+            "total_missions": result.total_missions,
+            "matches": "" if result.matches is None else result.matches,
+            # name=count pairs, in catalog order
+            "missions": ";".join(f"{mission.name}={mission.missions}" for mission in result.missions),
+            "error": "",
+        })
+
+
+def run_plan(source, target, input_format, output_format, catalog=None, cache=None):
+    """Plan every row of ``source`` into ``target``; returns ``(rows, errors)``."""
+    writer = CsvWriter(target) if output_format == "csv" else JsonlWriter(target)
+    rows = errors = 0
+    for row in read_rows(source, input_format):
+        rows += 1
+        try:
+            row = parse_row(row)
+            result = plan_row(row, catalog, cache)
+        except ROW_ERRORS as e:
+            errors += 1
+            writer.write(None, row, error=str(e))
+        else:
+            writer.write(result, row)
+    return rows, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="RivalsCalculateLord.py", description="Batch rank planning")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = commands.add_parser("plan", help="plan every player state in a JSONL or CSV file")
+    plan_parser.add_argument("--input", "-i", default="-", help="players file (.jsonl or .csv), - for stdin")
+    plan_parser.add_argument("--output", "-o", default="-", help="plans file, - for stdout")
+    plan_parser.add_argument("--input-format", choices=FORMATS)
+    plan_parser.add_argument("--format", "-f", dest="output_format", choices=FORMATS)
+
+    serve_parser = commands.add_parser("serve", help="answer plan requests over HTTP")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        return serve_command(args)
+
+    input_format = args.input_format or _format_for(args.input)
+    output_format = args.output_format or _format_for(args.output)
+    catalog = load_catalog()
+    cache = PlanCache()
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        rows, errors = run_plan(source, target, input_format, output_format, catalog, cache)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    stats = cache.stats
+    print(f"Planned {rows - errors:,} of {rows:,} rows ({stats.hits:,} cache hits, {stats.misses:,} misses,"
+          f" {stats.evictions:,} evictions)", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def serve_command(args):
+    import asyncio
+
+    from server import serve
+
+    def ready(port):
+        print(f"Serving plans on http://{args.host}:{port}", file=sys.stderr)
+
+    try:
+        asyncio.run(serve(load_catalog(), args.host, args.port, ready=ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,96 @@
+"""Hero roles and the registry behind the character picker.
+
+:data:`ROLES` lists the heroes of each role. It is plain data so Tk-free code
+(storage queries, progress summaries) can filter by role too.
+
+:class:`HeroRegistry` is built once from the role lists: a hero → roles map plus every role filter's
+list already sorted both ways, so changing the filter or the sort order is a
+dictionary lookup. Display labels (with a ★ for completed heroes) are cached
+per view and patched in place when a hero's completion changes.
+"""
+
+ALL_ROLES = "All"
+STAR = " ★"
+
+# Heroes per role, as offered by the role filter
+ROLES = {
+    "Vanguard": ["Banner/Hulk", "Captain America", "Doctor Strange", "Groot", "Magneto", "Venom", "Emma Frost", "The Thing", "Peni Parker", "Angela", "Rogue"],
+    "Duelist": ["Black Panther", "Black Widow", "Hawkeye", "Hela", "Iron Fist", "Iron Man", "Magik", "Moon Knight", "Namor", "Psylocke", "Scarlet Witch", "Spider-Man", "Squirrel Girl", "Star-Lord", "Storm", "The Punisher", "Winter Soldier", "Wolverine", "Blade", "Human Torch", "Phoenix", "Daredevil"],
+    "Strategist": ["Adam Warlock", "Cloak & Dagger", "Invisible Woman", "Jeff The Land Shark", "Loki", "Luna Snow", "Mantis", "Mister Fantastic", "Rocket Raccoon", "Thor", "Ultron", "Gambit"],
+}
+
+
+def hero_roles(roles=None):
+    """``{hero: role}`` from a role → heroes map (:data:`ROLES` by default); the first role wins."""
+    result = {}
+    for role, heroes in (ROLES if roles is None else roles).items():
+        for hero in heroes:
+            result.setdefault(hero, role)
+    return result
+
+
+class HeroRegistry:
+    def __init__(self, roles, completed=()):
+        self.roles = {}
+        for role, heroes in roles.items():
+            for hero in heroes:
+                self.roles.setdefault(hero, []).append(role)
+        self.completed = set(completed)
+        # Bumped on every completion change, so callers can tell when labels changed
+        self.version = 0
+
+        # (role, ascending) -> names in display order
+        self._views = {}
+        for role in [ALL_ROLES, *roles]:
+            names = sorted(self.roles if role == ALL_ROLES else set(roles[role]))
+            self._views[role, True] = tuple(names)
+            self._views[role, False] = tuple(reversed(names))
+        # Built on first use, kept up to date by set_completed()
+        self._labels = {}
+        self._positions = {}
+
+    def __contains__(self, hero):
+        return hero in self.roles
+
+    def __iter__(self):
+        return iter(self._views[ALL_ROLES, True])
+
+    def __len__(self):
+        return len(self.roles)
+
+    def view(self, role=ALL_ROLES, ascending=True):
+        """Hero names for a role filter, sorted A-Z or Z-A."""
+        return self._views.get((role, ascending), ())
+
+    def label(self, hero):
+        return hero + STAR if hero in self.completed else hero
+
+    def labels(self, role=ALL_ROLES, ascending=True):
+        """Display labels for :meth:`view`, updated in place by :meth:`set_completed`."""
+        key = (role, ascending)
+        labels = self._labels.get(key)
+        if labels is None:
+            names = self.view(role, ascending)
+            labels = self._labels[key] = [self.label(hero) for hero in names]
+            self._positions[key] = {hero: i for i, hero in enumerate(names)}
+        return labels
+
+    def strip(self, label):
+        """Hero name from a display label."""
+        return label[:-len(STAR)] if label.endswith(STAR) else label
+
+    def set_completed(self, hero, done):
+        """Mark ``hero``; returns ``True`` if that changed anything."""
+        if done == (hero in self.completed):
+            return False
+        if done:
+            self.completed.add(hero)
+        else:
+            self.completed.discard(hero)
+        self.version += 1
+        label = self.label(hero)
+        for key, labels in self._labels.items():
+            position = self._positions[key].get(hero)
+            if position is not None:
+                labels[position] = label
+        return True
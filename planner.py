@@ -0,0 +1,343 @@
+"""Tk-free rank planning engine for the Marvel Rivals Lord calculator.
+
+Everything the calculator needs to turn a player state (rank, points, hours
+played, target rank and mission set) into a plan lives here, so it can be
+used from batch jobs and other tools without creating a Tk window.
+"""
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+from allocation import MissionInput, allocate
+from ranks import POINTS_PER_HOUR, POINTS_PER_MISSION, RANK_THRESHOLDS, RANKS  # re-exported
+
+
+class PlanError(ValueError):
+    """Raised when a player state cannot be planned (e.g. invalid ranks)."""
+
+
+@dataclass(frozen=True)
+class MissionPlan:
+    name: str
+    points: int
+    requirement: Optional[int]
+    missions: int
+    completed: bool = False
+
+    @property
+    def total_points(self) -> int:
+        return self.points * self.missions
+
+    @property
+    def total_requirement(self) -> int:
+        return (self.requirement or 0) * self.missions
+
+
+@dataclass(frozen=True)
+class RankSegment:
+    """Missions done while in one rank on the way to the target."""
+    rank: str
+    points: int
+    mission_points: int
+    missions: int
+
+
+@dataclass(frozen=True)
+class Plan:
+    character: str
+    current_rank: str
+    target_rank: str
+    play_points: int
+    points_to_target: int
+    remaining: int
+    total_missions: int
+    segments: Tuple[RankSegment, ...] = ()
+    # Expected matches to finish the allocated missions, None without missions
+    matches: Optional[int] = None
+    missions: Tuple[MissionPlan, ...] = ()
+    character_completed: bool = False
+
+    def lines(self):
+        """Render the plan the way the calculator prints it."""
+        star = "★" if self.character_completed else ""
+        output_lines = [
+            f"Character: {self.character} {star}",
+            f"Playtime points: {self.play_points:,}",
+            f"Points still needed to {self.target_rank}: {self.remaining:,}",
+            f"Total missions required: {self.total_missions:,}",
+        ]
+        for segment in self.segments:
+            output_lines.append(f"  {segment.rank}: {segment.missions:,} missions at {segment.mission_points:,} pts")
+        if self.matches is not None:
+            output_lines.append(f"Expected matches: {self.matches:,}")
+        output_lines.append("")
+
+        if not self.missions:
+            output_lines.append("No missions added yet.")
+        for mission in self.missions:
+            star = "★" if mission.completed else ""
+            output_lines.append(f"{mission.name} {star}: {mission.missions:,} missions ({mission.total_points:,} pts)")
+            if mission.requirement:
+                output_lines.append(f"  → {mission.total_requirement:,} required")
+            output_lines.append("")
+        return output_lines
+
+    def text(self) -> str:
+        return "\n".join(self.lines())
+
+    def to_dict(self):
+        """Plain dict/list form of the plan, for JSON output."""
+        return asdict(self)
+
+
+class RankIndex:
+    """Prefix sums over the rank thresholds.
+
+    Player states are mapped to an absolute position on the Agent→Lord ladder,
+    which turns "points to target" into a subtraction and the inverse queries
+    into a bisect. Ranks are given as indices into ``RANKS`` so the methods can
+    be called from tight loops without name lookups.
+    """
+
+    def __init__(self, thresholds=RANK_THRESHOLDS, mission_points=POINTS_PER_MISSION):
+        self.ranks = tuple(thresholds)
+        self.thresholds = tuple(thresholds[rank] for rank in self.ranks)
+        self.mission_points = tuple(mission_points[rank] for rank in self.ranks)
+        # starts[i] = points needed from the start of the first rank to reach rank i
+        starts = [0]
+        for threshold in self.thresholds[:-1]:
+            starts.append(starts[-1] + threshold)
+        self.starts = tuple(starts)
+        self.last = len(self.ranks) - 1
+
+    def absolute(self, rank: int, points: int) -> int:
+        """Position of ``points`` into ``rank`` on the whole ladder."""
+        return self.starts[rank] + min(points, self.thresholds[rank])
+
+    def locate(self, absolute: int):
+        """Inverse of :meth:`absolute`: ``(rank, points)`` at a ladder position."""
+        rank = max(0, bisect_right(self.starts, absolute) - 1)
+        return rank, absolute - self.starts[rank]
+
+    def points_to(self, rank: int, points: int, target: int) -> int:
+        """Points needed to go from ``points`` in ``rank`` to the start of ``target``."""
+        return max(0, self.starts[target] - self.absolute(rank, points))
+
+    def segments(self, absolute: int, target: int):
+        """Missions needed in each rank to climb from ``absolute`` to ``target``.
+
+        Returns ``(rank, points, missions)`` per rank passed through. Each rank
+        is priced at its own points per mission and the overshoot of its last
+        mission carries into the next rank, one closed-form step per rank.
+        """
+        result = []
+        rank = self.locate(absolute)[0]
+        while rank < target:
+            value = self.mission_points[rank]
+            needed = self.starts[rank + 1] - absolute
+            missions = -(-needed // value)
+            result.append((rank, needed, missions))
+            absolute += missions * value
+            rank = self.locate(absolute)[0]
+        return result
+
+    def after_points(self, rank: int, points: int, earned: int):
+        """``(rank, points)`` reached after earning ``earned`` more points."""
+        return self.locate(self.absolute(rank, points) + earned)
+
+    def after_missions(self, rank: int, points: int, missions: int):
+        """``(rank, points)`` reached after ``missions`` more missions.
+
+        Each mission pays the points of the rank it is completed in, and the
+        overshoot of the mission that crosses a threshold carries over. At most
+        one step per rank, so the cost does not depend on ``missions``.
+        """
+        absolute = self.absolute(rank, points)
+        rank = self.locate(absolute)[0]
+        while missions > 0 and rank < self.last:
+            value = self.mission_points[rank]
+            to_next = self.starts[rank + 1] - absolute
+            needed = -(-to_next // value)
+            if missions < needed:
+                return self.locate(absolute + missions * value)
+            absolute += needed * value
+            missions -= needed
+            rank = self.locate(absolute)[0]
+        return self.locate(absolute + missions * self.mission_points[rank])
+
+
+RANK_INDEX = RankIndex()
+
+
+def rank_index(rank: str) -> int:
+    try:
+        return RANKS.index(rank)
+    except ValueError:
+        raise PlanError("Invalid rank selected") from None
+
+
+def points_to_target(current_rank: str, current_points: int, target_rank: str) -> int:
+    """Points needed to go from ``current_points`` in ``current_rank`` to ``target_rank``."""
+    current_index = rank_index(current_rank)
+    target_index = rank_index(target_rank)
+    if target_index <= current_index:
+        raise PlanError("Target rank must be higher than current rank")
+    return RANK_INDEX.points_to(current_index, current_points, target_index)
+
+
+def plan(current_rank: str, current_points: int, hours_played: int, target_rank: str,
+         missions: Optional[Mapping[str, Mapping]] = None, character: str = "",
+         completed=(), character_completed: bool = False) -> Plan:
+    """Build a :class:`Plan` for one player state.
+
+    ``missions`` maps mission names to ``{"points": ..., "requirement": ...}``
+    dicts, the same shape as one rank of the mission catalog, optionally with a
+    ``"rate"`` (expected progress per match). ``completed`` is the collection
+    of mission names already done for ``target_rank``; those are skipped when
+    the missions are allocated.
+    """
+    to_target = points_to_target(current_rank, current_points, target_rank)
+
+    # Playtime is counted first, then missions are priced rank by rank
+    play_points = hours_played * POINTS_PER_HOUR
+    remaining = max(0, to_target - play_points)
+    start = RANK_INDEX.absolute(rank_index(current_rank), current_points) + play_points
+    segments = tuple(
+        RankSegment(rank=RANKS[rank], points=points, mission_points=RANK_INDEX.mission_points[rank], missions=count)
+        for rank, points, count in RANK_INDEX.segments(start, rank_index(target_rank))
+    )
+    total_missions = sum(segment.missions for segment in segments)
+
+    mission_plans = []
+    matches = None
+    if missions:
+        open_missions = [MissionInput(name, info.get("requirement"), info.get("rate"))
+                         for name, info in missions.items() if name not in completed]
+        counts = {}
+        if open_missions:
+            allocation = allocate(total_missions, open_missions)
+            matches = allocation.matches
+            counts = dict(zip((mission.name for mission in open_missions), allocation.counts))
+        for name, info in missions.items():
+            mission_plans.append(MissionPlan(
+                name=name,
+                points=info["points"],
+                requirement=info.get("requirement"),
+                missions=counts.get(name, 0),
+                completed=name in completed,
+            ))
+
+    return Plan(
+        character=character,
+        current_rank=current_rank,
+        target_rank=target_rank,
+        play_points=play_points,
+        points_to_target=to_target,
+        remaining=remaining,
+        total_missions=total_missions,
+        segments=segments,
+        matches=matches,
+        missions=tuple(mission_plans),
+        character_completed=character_completed,
+    )
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def plan_key(current_rank, current_points, hours_played, target_rank, missions=None, character="",
+             completed=(), character_completed=False):
+    """Normalized signature of a :func:`plan` call: equal keys give equal plans."""
+    mission_key = ()
+    done = frozenset()
+    if missions:
+        # Order matters: it is the order the plan lists the missions in
+        mission_key = tuple((name, info["points"], info.get("requirement"), info.get("rate"))
+                            for name, info in missions.items())
+        # Completed names only matter for missions that are listed
+        done = frozenset(name for name in missions if name in completed)
+    return (current_rank, int(current_points), int(hours_played), target_rank, mission_key, character,
+            done, bool(character_completed))
+
+
+class PlanCache:
+    """Bounded LRU cache in front of :func:`plan` (or any other computation).
+
+    Safe to share between threads. Entries belong to a *generation*: when
+    :meth:`set_generation` is given a new value (e.g. after the catalog or the
+    completion state changed) everything cached so far is dropped.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        # Bumped whenever entries are dropped; a value computed across a bump is not stored
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, self.invalidations, len(self._entries))
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+            self.invalidations += 1
+
+    def set_generation(self, generation):
+        """Drop every entry if ``generation`` differs from the current one."""
+        with self._lock:
+            if generation == self._generation:
+                return
+            self._generation = generation
+            self._epoch += 1
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+
+    def lookup(self, key, compute):
+        """Cached value for ``key``, calling ``compute()`` on a miss; exceptions are not cached."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            epoch = self._epoch
+        # Computed outside the lock so other threads are not held up
+        value = compute()
+        with self._lock:
+            if epoch == self._epoch:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def plan(self, *args, **kwargs) -> Plan:
+        """:func:`plan`, memoized on :func:`plan_key`."""
+        return self.lookup(plan_key(*args, **kwargs), lambda: plan(*args, **kwargs))
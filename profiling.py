@@ -0,0 +1,126 @@
+"""Opt-in timing of startup phases and hot GUI handlers.
+
+Switched on with ``RIVALS_CALC_TIMING=1`` or ``--timing`` on the command line.
+It records how long each startup phase took and times every call of the
+wrapped handlers (count, total, mean and max). The report is printed to stderr
+on exit. Set ``RIVALS_CALC_CPROFILE=path`` (or ``--cprofile path``) to also
+run the whole session under :mod:`cProfile` and dump the stats to ``path``.
+
+When it is off, :meth:`Profiler.phase` and :meth:`Profiler.wrap` cost nothing
+measurable.
+"""
+import functools
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+class CallStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class Profiler:
+    def __init__(self, enabled=False, cprofile_path=None):
+        self.enabled = enabled or bool(cprofile_path)
+        self.cprofile_path = cprofile_path
+        self.started = time.perf_counter()
+        self.phases = []  # (name, seconds) in the order they finished
+        self.calls = {}
+        self._cprofile = None
+
+    @classmethod
+    def from_environment(cls, argv=None):
+        """Build from the environment and remove ``--timing``/``--cprofile PATH`` from ``argv``."""
+        enabled = os.environ.get("RIVALS_CALC_TIMING", "") not in ("", "0")
+        cprofile_path = os.environ.get("RIVALS_CALC_CPROFILE") or None
+        if argv is not None:
+            if "--timing" in argv:
+                argv.remove("--timing")
+                enabled = True
+            if "--cprofile" in argv:
+                index = argv.index("--cprofile")
+                if index + 1 < len(argv):
+                    cprofile_path = argv[index + 1]
+                    del argv[index:index + 2]
+        return cls(enabled, cprofile_path)
+
+    def start(self):
+        """Start cProfile, if a dump path was given."""
+        if self.cprofile_path and self._cprofile is None:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def mark(self, name):
+        """Record ``name`` as a phase ending now, measured from process start."""
+        if self.enabled:
+            self.phases.append((f"{name} (since start)", time.perf_counter() - self.started))
+
+    def record(self, name, seconds):
+        stats = self.calls.get(name)
+        if stats is None:
+            stats = self.calls[name] = CallStats()
+        stats.add(seconds)
+
+    def timed(self, fn, name=None):
+        """``fn`` wrapped so every call is recorded under ``name``."""
+        if not self.enabled:
+            return fn
+        name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return wrapper
+
+    def wrap(self, obj, *names):
+        """Replace the methods ``names`` of ``obj`` with timed versions."""
+        if self.enabled:
+            for name in names:
+                setattr(obj, name, self.timed(getattr(obj, name), name))
+
+    def report(self):
+        lines = ["Startup phases:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<28} {seconds * 1000:9.1f} ms")
+        lines.append("Calls:")
+        for name, stats in sorted(self.calls.items(), key=lambda item: -item[1].total):
+            lines.append(f"  {name:<28} {stats.count:6}x  total {stats.total * 1000:9.1f} ms"
+                         f"  mean {stats.total / stats.count * 1000:7.2f} ms  max {stats.max * 1000:7.2f} ms")
+        return "\n".join(lines)
+
+    def finish(self):
+        """Stop cProfile, dump its stats and print the report."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile = None
+        if self.enabled:
+            print(self.report(), file=sys.stderr)
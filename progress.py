@@ -0,0 +1,195 @@
+"""Bitset view of completed missions.
+
+A player's completed missions are stored as one Python ``int`` with bit
+``slot`` set for every completed catalog row (see :mod:`catalog`). Masks for
+each hero, rank and role are built once from the catalog, so "how many of
+Groot's Knight missions are done" or "how far along are the Strategists" is an
+``&`` and a popcount, with no walk over heroes or missions. A profile costs
+one bit per catalog row (under a hundred bytes for the current catalog), so
+thousands of profiles fit comfortably in memory.
+
+Print a summary of a saved progress file with::
+
+    python progress.py completed.json
+"""
+from typing import NamedTuple
+
+from planner import RANKS
+
+try:
+    _popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def _popcount(bits):
+        return bin(bits).count("1")
+
+
+class Tally(NamedTuple):
+    done: int
+    total: int
+
+    @property
+    def percent(self) -> float:
+        return 100.0 * self.done / self.total if self.total else 0.0
+
+
+class CompletionBits:
+    """Hero, rank and role masks over one catalog.
+
+    ``roles`` maps role names to hero names; heroes missing from the catalog
+    are ignored.
+    """
+
+    def __init__(self, catalog, roles=None):
+        self.catalog = catalog
+        n_ranks = len(RANKS)
+
+        self.hero_masks = []
+        for hero_id in range(len(catalog.heroes)):
+            first = catalog.offsets[hero_id * n_ranks]
+            last = catalog.offsets[(hero_id + 1) * n_ranks]
+            self.hero_masks.append(((1 << (last - first)) - 1) << first)
+
+        rank_masks = [0] * n_ranks
+        for slot, rank_id in enumerate(catalog.rank_ids):
+            rank_masks[rank_id] |= 1 << slot
+        self.rank_masks = dict(zip(RANKS, rank_masks))
+
+        self.role_masks = {}
+        for role, heroes in (roles or {}).items():
+            mask = 0
+            for hero in heroes:
+                if hero in catalog:
+                    mask |= self.hero_masks[catalog.hero_id(hero)]
+            self.role_masks[role] = mask
+
+        # Missions that earn points towards Lord: every rank below it
+        self.lord_mask = 0
+        for rank in RANKS[:-1]:
+            self.lord_mask |= self.rank_masks[rank]
+        self.all_mask = (1 << len(catalog)) - 1
+
+    def from_ids(self, mission_ids):
+        """Bits for a collection of mission ids; ids not in the catalog are skipped."""
+        bits = 0
+        slot_for_uid = self.catalog.slot_for_uid
+        for mission_id in mission_ids:
+            slot = slot_for_uid(mission_id)
+            if slot is not None:
+                bits |= 1 << slot
+        return bits
+
+    def to_ids(self, bits):
+        """Mission ids of the set bits, in catalog order."""
+        ids = []
+        while bits:
+            low = bits & -bits
+            ids.append(self.catalog.mission_uids[low.bit_length() - 1])
+            bits ^= low
+        return ids
+
+    def is_completed(self, bits, mission_id):
+        slot = self.catalog.slot_for_uid(mission_id)
+        return slot is not None and bool(bits >> slot & 1)
+
+    def set_completed(self, bits, mission_id, done):
+        """``bits`` with ``mission_id`` marked (or unmarked) completed."""
+        slot = self.catalog.slot_for_uid(mission_id)
+        if slot is None:
+            return bits
+        return bits | (1 << slot) if done else bits & ~(1 << slot)
+
+    def mask(self, hero=None, rank=None, role=None):
+        """Slots matching every given filter."""
+        mask = self.all_mask
+        if hero is not None:
+            mask &= self.hero_masks[self.catalog.hero_id(hero)]
+        if rank is not None:
+            mask &= self.rank_masks[rank]
+        if role is not None:
+            mask &= self.role_masks.get(role, 0)
+        return mask
+
+    def tally(self, bits, hero=None, rank=None, role=None):
+        """Completed and total missions matching the filters."""
+        mask = self.mask(hero, rank, role)
+        return Tally(_popcount(bits & mask), _popcount(mask))
+
+    def to_lord(self, bits, hero=None, role=None):
+        """Completed share of the missions below Lord, for one hero, one role or everyone."""
+        mask = self.mask(hero, role=role) & self.lord_mask
+        return Tally(_popcount(bits & mask), _popcount(mask))
+
+    def by_hero(self, bits, rank=None):
+        rank_mask = self.rank_masks[rank] if rank is not None else self.all_mask
+        return {
+            hero: Tally(_popcount(bits & mask & rank_mask), _popcount(mask & rank_mask))
+            for hero, mask in zip(self.catalog.heroes, self.hero_masks)
+        }
+
+    def by_rank(self, bits):
+        return {rank: Tally(_popcount(bits & mask), _popcount(mask)) for rank, mask in self.rank_masks.items()}
+
+    def by_role(self, bits, rank=None):
+        rank_mask = self.rank_masks[rank] if rank is not None else self.all_mask
+        return {
+            role: Tally(_popcount(bits & mask & rank_mask), _popcount(mask & rank_mask))
+            for role, mask in self.role_masks.items()
+        }
+
+
+class ProfileBits:
+    """Completion bits for many player profiles over one :class:`CompletionBits`."""
+
+    def __init__(self, index):
+        self.index = index
+        self.profiles = {}
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def __getitem__(self, profile):
+        return self.profiles.get(profile, 0)
+
+    def load(self, profile, mission_ids):
+        self.profiles[profile] = self.index.from_ids(mission_ids)
+
+    def load_all(self, store):
+        """Load every profile of a :class:`storage.SQLiteStore`."""
+        for profile, mission_ids in store.profile_missions().items():
+            self.load(profile, mission_ids)
+
+    def set_completed(self, profile, mission_id, done):
+        self.profiles[profile] = self.index.set_completed(self.profiles.get(profile, 0), mission_id, done)
+
+    def to_lord(self, hero=None, role=None):
+        """``{profile: Tally}`` of progress towards Lord."""
+        mask = self.index.mask(hero, role=role) & self.index.lord_mask
+        total = _popcount(mask)
+        return {profile: Tally(_popcount(bits & mask), total) for profile, bits in self.profiles.items()}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from catalog import load_catalog
+    from heroes import ROLES
+    from storage import open_store
+
+    parser = argparse.ArgumentParser(description="Summarize saved mission progress")
+    parser.add_argument("path", nargs="?", default="completed.json")
+    parser.add_argument("--profile", default="default")
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    store = open_store(args.path, profile=args.profile, write_behind=False, catalog=catalog)
+    index = CompletionBits(catalog, ROLES)
+    bits = index.from_ids(store.load()["missions"])
+    store.close()
+
+    for rank, tally in index.by_rank(bits).items():
+        print(f"{rank:<10} {tally.done:>4}/{tally.total:<4} {tally.percent:5.1f}%")
+    lord = index.to_lord(bits)
+    print(f"{'To Lord':<10} {lord.done:>4}/{lord.total:<4} {lord.percent:5.1f}%")
+    for role in ROLES:
+        tally = index.to_lord(bits, role=role)
+        print(f"{role:<10} {tally.done:>4}/{tally.total:<4} {tally.percent:5.1f}% to Lord")
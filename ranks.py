@@ -0,0 +1,27 @@
+"""Rank tables shared by the planner, the catalog and the GUI.
+
+Kept apart from :mod:`planner` so the window can list the ranks without
+importing the planning engine before it is first drawn.
+"""
+
+# Rank thresholds based on PDF (points needed to reach next rank from current)
+RANK_THRESHOLDS = {
+    "Agent": 500,
+    "Knight": 1200,
+    "Captain": 2000,
+    "Centurion": 2400,
+    "Lord": 0  # No further threshold
+}
+
+# Points per mission based on rank (from PDF)
+POINTS_PER_MISSION = {
+    "Agent": 10,
+    "Knight": 25,
+    "Captain": 40,
+    "Centurion": 50,
+    "Lord": 50  # Same as Centurion
+}
+
+RANKS = tuple(RANK_THRESHOLDS)
+
+POINTS_PER_HOUR = 60
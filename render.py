@@ -0,0 +1,106 @@
+"""Incremental rendering of long reports into a read-only Tk ``Text``.
+
+:class:`OutputRenderer` writes the first screen of a report right away and the
+rest in chunks from idle callbacks, each limited to a few milliseconds, so the
+window keeps handling input while thousands of lines go in. A new report
+cancels whatever is still being written.
+
+Reports longer than ``visible_threshold`` lines are shown in "visible region"
+mode: only the first page is written, and further pages are appended as the
+user scrolls near the end, so lines nobody looks at are never inserted.
+"""
+import time
+
+CHUNK_LINES = 200
+BUDGET_MS = 8
+VISIBLE_THRESHOLD = 5000
+PAGE_LINES = 500
+# Load the next page once the view gets this close to the end
+PREFETCH_AT = 0.9
+
+
+class OutputRenderer:
+    def __init__(self, widget, yscrollcommand=None, chunk_lines=CHUNK_LINES, budget_ms=BUDGET_MS,
+                 visible_threshold=VISIBLE_THRESHOLD, page_lines=PAGE_LINES):
+        self.widget = widget
+        self.chunk_lines = chunk_lines
+        self.budget = budget_ms / 1000
+        self.visible_threshold = visible_threshold
+        self.page_lines = page_lines
+        self._yscrollcommand = yscrollcommand
+        self._lines = []
+        self._position = 0
+        self._job = None
+        self.visible_only = False
+        widget.configure(yscrollcommand=self._on_scroll)
+
+    @property
+    def done(self):
+        return self._position >= len(self._lines)
+
+    def render(self, lines):
+        """Replace the widget content with ``lines`` (a list of strings without newlines)."""
+        self.cancel()
+        self._lines = lines
+        self._position = 0
+        self.visible_only = len(lines) > self.visible_threshold
+
+        self.widget.config(state="normal")
+        self.widget.delete(1.0, "end")
+        self.widget.config(state="disabled")
+        self._write(self.page_lines if self.visible_only else self._screen_lines())
+        if not self.visible_only:
+            self._schedule()
+
+    def render_text(self, text):
+        self.render(text.split("\n"))
+
+    def cancel(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def finish(self):
+        """Write everything that is left right away."""
+        self.cancel()
+        self._write(len(self._lines) - self._position)
+
+    def _screen_lines(self):
+        try:
+            return int(self.widget.cget("height")) + 1
+        except (TypeError, ValueError):
+            return self.chunk_lines
+
+    def _write(self, count):
+        start = self._position
+        end = min(len(self._lines), start + count)
+        if end <= start:
+            return
+        text = "\n".join(self._lines[start:end])
+        if start:
+            text = "\n" + text
+        self.widget.config(state="normal")
+        self.widget.insert("end", text)
+        self.widget.config(state="disabled")
+        self._position = end
+
+    def _schedule(self):
+        if self._job is None and not self.done:
+            self._job = self.widget.after_idle(self._step)
+
+    def _step(self):
+        self._job = None
+        deadline = time.perf_counter() + self.budget
+        while not self.done and time.perf_counter() < deadline:
+            self._write(self.chunk_lines)
+        self._schedule()
+
+    def _load_page(self):
+        self._job = None
+        self._write(self.page_lines)
+
+    def _on_scroll(self, first, last):
+        if self._yscrollcommand is not None:
+            self._yscrollcommand(first, last)
+        if self.visible_only and self._job is None and not self.done and float(last) >= PREFETCH_AT:
+            self._job = self.widget.after_idle(self._load_page)
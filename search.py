@@ -0,0 +1,152 @@
+"""Fuzzy character search.
+
+:class:`CharacterIndex` is built once from the role lists. Every name is
+stored lowercased and with punctuation stripped, split into words, and
+indexed by prefix and by trigram, with a bitmask of its roles. A query is
+matched, best first, as:
+
+0. the whole name,
+1. a prefix of the name (``"jeff"``),
+2. word prefixes or initials (``"cap am"``, ``"dr strange"``, ``"jtls"``),
+3. a substring (``"lord"``),
+4. a trigram match for typos (``"spiderman"``, ``"wolverien"``).
+"""
+import re
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Share of trigrams a typo'd query must have in common with a name
+MIN_SIMILARITY = 0.3
+
+# Longest prefix stored in the prefix table
+PREFIX_LENGTH = 4
+
+# Common short forms that do not appear in the names themselves
+ALIASES = {
+    "dr": "doctor",
+    "mr": "mister",
+}
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CharacterIndex:
+    def __init__(self, roles=None):
+        self.names = []
+        self.role_ids = {}
+        self.role_masks = []
+        self.keys = []
+        self.compact_keys = []
+        self.words = []
+        self.initials = []
+        self.prefixes = {}
+        self.trigrams = {}
+        self.trigram_counts = []
+        self._ids = {}
+        for role, names in (roles or {}).items():
+            for name in names:
+                self.add(name, role)
+
+    def add(self, name, role=None):
+        """Index ``name`` (again, if it is already known) under ``role``."""
+        role_bit = 0
+        if role is not None:
+            role_bit = 1 << self.role_ids.setdefault(role, len(self.role_ids))
+        index = self._ids.get(name)
+        if index is not None:
+            self.role_masks[index] |= role_bit
+            return index
+
+        index = self._ids[name] = len(self.names)
+        key = name.lower()
+        words = _WORD.findall(key)
+        compact = "".join(words)
+        self.names.append(name)
+        self.role_masks.append(role_bit)
+        self.keys.append(key)
+        self.compact_keys.append(compact)
+        self.words.append(words)
+        self.initials.append("".join(word[0] for word in words))
+
+        for word in words + [compact, self.initials[index]]:
+            for length in range(1, min(len(word), PREFIX_LENGTH) + 1):
+                self.prefixes.setdefault(word[:length], set()).add(index)
+        trigrams = _trigrams(compact)
+        self.trigram_counts.append(len(trigrams))
+        for trigram in trigrams:
+            self.trigrams.setdefault(trigram, set()).add(index)
+        return index
+
+    def role_mask(self, role):
+        """Bitmask for ``role``; ``None`` or ``"All"`` matches every character."""
+        if role is None or role == "All":
+            return -1
+        return 1 << self.role_ids[role] if role in self.role_ids else 0
+
+    def filter(self, role=None):
+        mask = self.role_mask(role)
+        return [name for name, roles in zip(self.names, self.role_masks) if roles & mask]
+
+    def _word_match(self, tokens, words):
+        # Each token must start a word, in order (tokens may skip words)
+        position = 0
+        for token in tokens:
+            while position < len(words) and not words[position].startswith(token):
+                position += 1
+            if position == len(words):
+                return False
+            position += 1
+        return True
+
+    def _score(self, index, query, tokens):
+        compact = self.compact_keys[index]
+        if compact == query:
+            return 0.0
+        if compact.startswith(query):
+            return 1.0
+        if self._word_match(tokens, self.words[index]) or self.initials[index].startswith(query):
+            return 2.0
+        if query in compact:
+            return 3.0
+        return None
+
+    def search(self, query, role=None, limit=None):
+        """Names matching ``query`` within ``role``, best match first."""
+        mask = self.role_mask(role)
+        tokens = [ALIASES.get(token, token) for token in _WORD.findall(query.lower())]
+        query = "".join(tokens)
+        if not query:
+            return self.filter(role)
+
+        # Prefix table narrows the candidates for word, prefix and initials matches
+        scored = {}
+        for index in self.prefixes.get(tokens[0][:PREFIX_LENGTH], ()):
+            if self.role_masks[index] & mask:
+                score = self._score(index, query, tokens)
+                if score is not None:
+                    scored[index] = score
+        # Substrings that do not start a word
+        for index, compact in enumerate(self.compact_keys):
+            if index not in scored and self.role_masks[index] & mask and query in compact:
+                scored[index] = 3.0
+
+        # Typos: rank by shared trigrams
+        query_trigrams = _trigrams(query)
+        shared = {}
+        for trigram in query_trigrams:
+            for index in self.trigrams.get(trigram, ()):
+                shared[index] = shared.get(index, 0) + 1
+        for index, count in shared.items():
+            if index in scored or not self.role_masks[index] & mask:
+                continue
+            similarity = 2 * count / (len(query_trigrams) + self.trigram_counts[index])
+            if similarity >= MIN_SIMILARITY:
+                scored[index] = 5.0 - similarity
+
+        ranked = sorted(scored, key=lambda index: (scored[index], self.keys[index]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.names[index] for index in ranked]
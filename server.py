@@ -0,0 +1,171 @@
+"""Local HTTP/JSON planning service.
+
+A small asyncio server for bots and dashboards that need plans on demand::
+
+    python RivalsCalculateLord.py serve --port 8765
+
+Endpoints:
+
+``POST /plan``
+    One player state (same fields as the batch mode in :mod:`cli`) or a JSON
+    array of them; answers with the plan, or an array of plans in the same
+    order. Failed entries in a batch carry an ``error`` instead.
+``GET /heroes``
+    Every hero in the catalog with its stable id.
+``GET /missions?hero=NAME[&rank=RANK]``
+    A hero's missions for one rank, or for every rank.
+``GET /stats``
+    Request count and plan cache hits, misses and evictions.
+
+Connections are kept alive (HTTP/1.1 semantics) so clients can send request
+after request without reconnecting. Encoded plans are kept in a
+:class:`planner.PlanCache` keyed on the normalized input, so a repeated
+request costs a dictionary lookup.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from cli import ROW_ERRORS, normalize_row, plan_row
+from planner import RANKS, PlanCache
+
+MAX_BODY = 1 << 20
+MAX_BATCH = 1000
+CACHE_SIZE = 4096
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PlanService:
+    def __init__(self, catalog, cache_size=CACHE_SIZE):
+        self.catalog = catalog
+        self.cache = PlanCache(cache_size)
+        # Cached responses are only valid for this catalog
+        self.cache.set_generation(id(catalog))
+        self.requests = 0
+
+    def plan_json(self, row):
+        """Encoded plan (or error object) for one input row."""
+        if not isinstance(row, dict):
+            return json.dumps({"error": "Expected a JSON object"})
+        try:
+            key = normalize_row(row)
+        except ROW_ERRORS as e:
+            return json.dumps({"error": str(e)})
+
+        def compute():
+            try:
+                return json.dumps(plan_row(row, self.catalog).to_dict())
+            except ROW_ERRORS as e:
+                return json.dumps({"error": str(e)})
+        try:
+            return self.cache.lookup(key, compute)
+        except Exception as e:
+            # e.g. a list where a rank name belongs makes the key unhashable; only this entry fails
+            return json.dumps({"error": str(e)})
+
+    def handle(self, method, target, body):
+        """Return ``(status, encoded JSON)`` for one request."""
+        url = urlsplit(target)
+        if url.path == "/plan":
+            if method != "POST":
+                raise HttpError(405, "Use POST")
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                raise HttpError(400, "Body is not valid JSON")
+            if isinstance(payload, list):
+                if len(payload) > MAX_BATCH:
+                    raise HttpError(413, f"At most {MAX_BATCH} states per request")
+                # Cached entries are already encoded, so the batch is spliced together as text
+                return 200, "[" + ",".join(self.plan_json(row) for row in payload) + "]"
+            encoded = self.plan_json(payload)
+            return (400 if encoded.startswith('{"error"') else 200), encoded
+
+        if method != "GET":
+            raise HttpError(405, "Use GET")
+        if url.path == "/stats":
+            return 200, json.dumps({"requests": self.requests, "cache": self.cache.stats._asdict()})
+        if url.path == "/heroes":
+            return 200, json.dumps([{"id": self.catalog.hero_uid(hero), "name": hero} for hero in self.catalog.heroes])
+        if url.path == "/missions":
+            query = parse_qs(url.query)
+            hero = query.get("hero", [""])[0]
+            if hero not in self.catalog:
+                raise HttpError(404, f"Unknown hero: {hero}")
+            ranks = query.get("rank") or list(RANKS)
+            if any(rank not in RANKS for rank in ranks):
+                raise HttpError(400, "Invalid rank selected")
+            return 200, json.dumps({rank: self.catalog.mission_data(hero, rank) for rank in ranks})
+        raise HttpError(404, f"No endpoint {url.path}")
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    return
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # The body cannot be framed, so the connection cannot be reused either
+                    status, encoded, keep_alive = 400, json.dumps({"error": "Invalid Content-Length"}), False
+                elif length > MAX_BODY:
+                    status, encoded, keep_alive = 413, json.dumps({"error": "Body too large"}), False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    self.requests += 1
+                    try:
+                        status, encoded = self.handle(method, target, body)
+                    except HttpError as e:
+                        status, encoded = e.status, json.dumps({"error": str(e)})
+                    except Exception as e:
+                        status, encoded = 500, json.dumps({"error": str(e)})
+
+                data = encoded.encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(catalog, host="127.0.0.1", port=8765, ready=None):
+    """Run the service until cancelled; ``ready`` (a callable) gets the bound port."""
+    service = PlanService(catalog)
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
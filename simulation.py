@@ -0,0 +1,213 @@
+"""Monte Carlo estimate of the time needed to reach Lord.
+
+Each trial plays simulated matches for one hero: every match adds playtime
+points and a random amount of progress to each mission of the hero's current
+rank, drawn from a per-stat distribution around the rates in
+:mod:`allocation`. Completed missions pay the rank's points, and the mission
+set switches when a threshold is crossed. Trials run in a process pool in
+fixed-size chunks, each with its own seed derived from the base seed, hero and
+chunk number, so results do not depend on the number of workers. Only a few
+chunks per worker are in flight at a time, and each reports a histogram of
+match counts that is merged as it arrives, so memory does not grow with the
+number of trials.
+
+Run from the command line with::
+
+    python simulation.py --trials 5000
+"""
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import NamedTuple
+
+from allocation import match_rate, mission_stat
+from planner import RANKS, RANK_INDEX, POINTS_PER_HOUR
+
+MATCH_MINUTES = 20
+
+# Spread of each stat between matches, as a fraction of its mean
+STAT_SPREAD = {
+    "damage": 0.45,
+    "heal": 0.5,
+    "block": 0.5,
+    "kos_assists": 0.4,
+    "kos": 0.5,
+    "final_hits": 0.6,
+    "ability": 0.7,
+}
+
+# Trials that have not reached the target after this many matches stop there
+MAX_MATCHES = 5000
+
+CHUNK_SIZE = 250
+# Chunks submitted per worker ahead of the results being merged
+CHUNKS_IN_FLIGHT = 2
+
+
+class SimulationResult(NamedTuple):
+    hero: str
+    trials: int
+    mean_matches: float
+    p50_matches: int
+    p90_matches: int
+
+    @property
+    def p50_hours(self) -> float:
+        return self.p50_matches * MATCH_MINUTES / 60
+
+    @property
+    def p90_hours(self) -> float:
+        return self.p90_matches * MATCH_MINUTES / 60
+
+
+class MatchHistogram:
+    """Streaming histogram of match counts with percentile queries."""
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.sum = 0
+
+    def add(self, matches, count=1):
+        self.counts[matches] = self.counts.get(matches, 0) + count
+        self.total += count
+        self.sum += matches * count
+
+    def merge(self, counts):
+        for matches, count in counts.items():
+            self.add(matches, count)
+
+    def percentile(self, fraction):
+        wanted = fraction * self.total
+        seen = 0
+        for matches in sorted(self.counts):
+            seen += self.counts[matches]
+            if seen >= wanted:
+                return matches
+        return 0
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+
+def hero_profile(catalog, hero):
+    """Per-rank ``(requirement, mean, spread, points)`` tuples for one hero.
+
+    Plain tuples, so the profile can be sent to worker processes.
+    """
+    profile = []
+    for rank in RANKS:
+        missions = []
+        for mission in catalog.missions(hero, rank):
+            mean = match_rate(mission.name, mission.requirement) or 1.0
+            spread = mean * STAT_SPREAD[mission_stat(mission.name)]
+            missions.append((mission.requirement or 1, mean, spread, mission.points))
+        profile.append(tuple(missions))
+    return tuple(profile)
+
+
+def simulate_chunk(profile, start, target, trials, seed):
+    """Run ``trials`` trials and return ``{matches: count}``."""
+    rng = random.Random(seed)
+    gauss = rng.gauss
+    locate = RANK_INDEX.locate
+    starts = RANK_INDEX.starts + (float("inf"),)
+    play_points = POINTS_PER_HOUR * MATCH_MINUTES // 60
+    counts = {}
+
+    for _ in range(trials):
+        absolute = start
+        rank = locate(absolute)[0]
+        next_rank_at = starts[rank + 1]
+        missions = profile[rank]
+        progress = [0.0] * len(missions)
+        matches = 0
+        while absolute < target and matches < MAX_MATCHES:
+            matches += 1
+            absolute += play_points
+            i = 0
+            for requirement, mean, spread, points in missions:
+                gain = gauss(mean, spread)
+                if gain > 0.0:
+                    value = progress[i] + gain
+                    if value >= requirement:
+                        done = int(value // requirement)
+                        value -= done * requirement
+                        absolute += done * points
+                    progress[i] = value
+                i += 1
+            if absolute >= next_rank_at:
+                # New rank, new missions
+                rank = locate(absolute)[0]
+                next_rank_at = starts[rank + 1]
+                missions = profile[rank]
+                progress = [0.0] * len(missions)
+        counts[matches] = counts.get(matches, 0) + 1
+    return counts
+
+
+def simulate(catalog, heroes=None, rank="Agent", points=0, target="Lord", trials=2000, seed=0, workers=None):
+    """Estimate match counts to ``target`` for each hero, using every core.
+
+    Returns a :class:`SimulationResult` per hero, in the order given.
+    """
+    heroes = list(heroes if heroes is not None else catalog.heroes)
+    start = RANK_INDEX.absolute(RANKS.index(rank), points)
+    goal = RANK_INDEX.starts[RANKS.index(target)]
+    histograms = {hero: MatchHistogram() for hero in heroes}
+
+    def chunks():
+        for hero in heroes:
+            profile = hero_profile(catalog, hero)
+            for chunk, first in enumerate(range(0, trials, CHUNK_SIZE)):
+                size = min(CHUNK_SIZE, trials - first)
+                yield hero, (profile, start, goal, size, f"{seed}:{hero}:{chunk}")
+
+    workers = workers or os.cpu_count()
+    pending = chunks()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        while True:
+            # Keep a bounded window of chunks submitted; finished ones are dropped once merged
+            while len(futures) < workers * CHUNKS_IN_FLIGHT:
+                item = next(pending, None)
+                if item is None:
+                    break
+                hero, args = item
+                futures[pool.submit(simulate_chunk, *args)] = hero
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                histograms[futures.pop(future)].merge(future.result())
+
+    return [
+        SimulationResult(
+            hero=hero,
+            trials=histograms[hero].total,
+            mean_matches=histograms[hero].mean(),
+            p50_matches=histograms[hero].percentile(0.5),
+            p90_matches=histograms[hero].percentile(0.9),
+        )
+        for hero in heroes
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from catalog import load_catalog
+
+    parser = argparse.ArgumentParser(description="Estimate matches and hours to Lord for every hero")
+    parser.add_argument("--rank", default="Agent", choices=RANKS)
+    parser.add_argument("--points", type=int, default=0)
+    parser.add_argument("--trials", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    results = simulate(load_catalog(), rank=args.rank, points=args.points,
+                       trials=args.trials, seed=args.seed, workers=args.workers)
+    for result in results:
+        print(f"{result.hero:<22} p50 {result.p50_matches:>5,} matches ({result.p50_hours:5.1f} h)"
+              f"  p90 {result.p90_matches:>5,} matches ({result.p90_hours:5.1f} h)")
@@ -0,0 +1,167 @@
+"""Opt-in monitor for stalls of the Tk event loop.
+
+A heartbeat is scheduled with ``after()`` every ``interval_ms``; how late it
+actually runs is how long the loop was blocked. Every lateness goes into a
+histogram, and any beat later than ``threshold_ms`` is logged as a stall
+together with the handlers that were slow since the previous beat, e.g.::
+
+    stall 412 ms: toggle_completed → save_completed (398 ms)
+
+Entry points are named by wrapping Tk's callback dispatch, so every command,
+binding and ``after()`` callback is covered; methods called from inside a
+handler show up in the chain once registered with :meth:`StallMonitor.track`.
+A beat that runs inside a nested ``update()`` reports the handlers still on
+the stack.
+
+Switched on with ``RIVALS_CALC_STALLS=1`` or ``--stalls``; the threshold can
+be changed with ``RIVALS_CALC_STALL_MS``.
+"""
+import functools
+import os
+import sys
+import time
+import tkinter
+from collections import deque
+
+from profiling import CallStats
+
+# Upper bounds (ms) of the lateness histogram buckets; the last one is open
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+def _handler_name(func):
+    # after() callbacks are wrapped, but the wrapper copies the function's name
+    return getattr(func, "__name__", None) or type(func).__name__
+
+
+class StallMonitor:
+    def __init__(self, root, interval_ms=50, threshold_ms=100, stream=None):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold = threshold_ms / 1000
+        self.stream = stream if stream is not None else sys.stderr
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.beats = 0
+        self.stalls = deque(maxlen=1000)  # (lateness seconds, chains)
+        self.chains = {}  # chain -> CallStats of the stalls it was blamed for
+        self._stack = []
+        self._slow = []  # (chain, seconds) since the last beat
+        self._expected = None
+        self._job = None
+        self._original_call = None
+
+    @classmethod
+    def from_environment(cls, root, argv=None):
+        """A monitor if ``--stalls`` (removed from ``argv``) or ``RIVALS_CALC_STALLS`` asks for one, else ``None``."""
+        enabled = os.environ.get("RIVALS_CALC_STALLS", "") not in ("", "0")
+        if argv is not None and "--stalls" in argv:
+            argv.remove("--stalls")
+            enabled = True
+        if not enabled:
+            return None
+        return cls(root, threshold_ms=float(os.environ.get("RIVALS_CALC_STALL_MS", 100)))
+
+    def start(self):
+        if self._original_call is None:
+            self._original_call = tkinter.CallWrapper.__call__
+            monitor = self
+            original = self._original_call
+
+            def call(wrapper, *args):
+                name = _handler_name(wrapper.func)
+                if name == "_heartbeat":
+                    return original(wrapper, *args)
+                start = monitor._enter(name)
+                try:
+                    return original(wrapper, *args)
+                finally:
+                    monitor._exit(start)
+            tkinter.CallWrapper.__call__ = call
+        self._schedule()
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        if self._original_call is not None:
+            tkinter.CallWrapper.__call__ = self._original_call
+            self._original_call = None
+
+    def track(self, obj, *names):
+        """Wrap the methods ``names`` of ``obj`` so they appear in stall chains."""
+        for name in names:
+            method = getattr(obj, name)
+            setattr(obj, name, self._tracked(method, name))
+
+    def _tracked(self, fn, name):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = self._enter(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._exit(start)
+        return wrapper
+
+    def _enter(self, name):
+        self._stack.append(name)
+        return time.perf_counter()
+
+    def _exit(self, start):
+        elapsed = time.perf_counter() - start
+        if elapsed >= self.threshold:
+            self._slow.append((" → ".join(self._stack), elapsed))
+        self._stack.pop()
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self._job = self.root.after(self.interval_ms, self._heartbeat)
+
+    def _heartbeat(self):
+        lateness = max(0.0, time.perf_counter() - self._expected)
+        self.beats += 1
+        lateness_ms = lateness * 1000
+        for i, bound in enumerate(BUCKETS_MS):
+            if lateness_ms <= bound:
+                self.histogram[i] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+        if lateness >= self.threshold:
+            chains = self._blame()
+            self.stalls.append((lateness, chains))
+            for chain, _ in chains:
+                stats = self.chains.get(chain)
+                if stats is None:
+                    stats = self.chains[chain] = CallStats()
+                stats.add(lateness)
+            described = ", ".join(chain if seconds is None else f"{chain} ({seconds * 1000:.0f} ms)"
+                                  for chain, seconds in chains)
+            print(f"stall {lateness_ms:.0f} ms: {described}", file=self.stream)
+        self._slow = []
+        self._schedule()
+
+    def _blame(self):
+        # Handlers still running (the beat came from a nested update()) come first
+        chains = []
+        if self._stack:
+            chains.append((" → ".join(self._stack) + " (running)", None))
+        # Keep only the innermost chain of nested slow calls
+        for chain, seconds in sorted(self._slow, key=lambda item: -item[0].count("→")):
+            if not any(other.startswith(chain + " → ") for other, _ in chains):
+                chains.append((chain, seconds))
+        return chains or [("(untracked)", None)]
+
+    def report(self):
+        lines = [f"Event loop: {self.beats} beats every {self.interval_ms} ms, {len(self.stalls)} stalls"]
+        lower = 0
+        for bound, count in zip(BUCKETS_MS + (None,), self.histogram):
+            label = f"{lower}-{bound} ms" if bound is not None else f">{lower} ms"
+            lines.append(f"  {label:<14} {count}")
+            lower = bound
+        if self.chains:
+            lines.append("Stalls by handler:")
+            for chain, stats in sorted(self.chains.items(), key=lambda item: -item[1].total):
+                lines.append(f"  {chain:<48} {stats.count:5}x  max {stats.max * 1000:7.0f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,611 @@
+"""Persistence of completed characters and missions.
+
+Every backend implements :class:`CompletionStore`: ``load()`` returns the
+state, toggles go through ``set_character``/``set_mission`` and update that
+same state in memory before being persisted. :func:`open_store` picks the
+backend from the file name.
+
+Heroes and missions are recorded by their stable catalog ids (see
+:mod:`catalog`), never by display name. Custom missions added in the GUI have
+no id and are recorded as ``(hero, rank, mission name)``. Files written by
+older versions, which used names, are converted on load with the help of the
+mission catalog; the original JSON files are kept with a ``.v1`` suffix.
+
+:class:`CompletionJournal` (the default) keeps a snapshot (``completed.json``)
+plus an append-only journal of the toggles made since that snapshot
+(``completed.journal``, one JSON event per line). A toggle
+appends a single line, so its cost does not depend on how much history the
+file holds. Once the journal grows past ``compact_after`` events it is
+rotated and folded into a new snapshot on a background thread.
+
+:class:`SQLiteStore` keeps one row per completion in an SQLite file that can
+hold many player profiles.
+"""
+import json
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from heroes import ROLES, hero_roles
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Version of the completed.json snapshot; files without one use names
+STATE_VERSION = 2
+
+
+def _state_to_json(characters, missions, custom):
+    # Convert sets to lists for JSON serialization
+    return {
+        "version": STATE_VERSION,
+        "characters": sorted(characters),
+        "missions": sorted(missions),
+        "custom": [list(key) for key in sorted(custom)],
+    }
+
+
+def _event_key(event):
+    """The item an event changes; later events for the same item replace it."""
+    if event["op"] == "custom":
+        return "custom", event["character"], event["rank"], event["mission"]
+    return event["op"], event.get("hero", event.get("id"))
+
+
+def _legacy_events(data):
+    """Events recreating a name-based (version 1) snapshot."""
+    for char in data.get("characters", []):
+        yield {"op": "character", "char": char, "done": True}
+    for char, ranks in data.get("missions", {}).items():
+        for rank, names in ranks.items():
+            for name in names:
+                yield {"op": "mission", "char": char, "rank": rank, "mission": name, "done": True}
+
+
+def write_atomic(path, data):
+    """Write ``data`` (a JSON-serializable object) to ``path`` via a temp file and rename."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class CompletionStore(ABC):
+    """Completion state shared with the GUI plus the backend that persists it."""
+
+    def __init__(self, catalog=None):
+        # Hero ids and mission ids marked completed
+        self.characters = set()
+        self.missions = set()
+        # (hero, rank, mission name) of completed custom missions
+        self.custom = set()
+        # Only needed to convert files saved by older versions
+        self.catalog = catalog
+        # _lock guards the in-memory sets and is only ever held briefly, so a
+        # toggle on the GUI thread never waits for the disk; _io_lock serializes
+        # the backend. When both are needed, _io_lock is taken first.
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+
+    @abstractmethod
+    def load(self):
+        """Return ``{"characters": set of hero ids, "missions": set of mission ids, "custom": set}``.
+
+        The store keeps updating these same objects as changes are recorded.
+        """
+
+    def set_character(self, hero_id, done):
+        self.record({"op": "character", "hero": hero_id, "done": done})
+
+    def set_mission(self, mission_id, done):
+        self.record({"op": "mission", "id": mission_id, "done": done})
+
+    def set_custom(self, hero, rank, mission, done):
+        """Mark a custom mission, which has no catalog id."""
+        self.record({"op": "custom", "character": hero, "rank": rank, "mission": mission, "done": done})
+
+    def record(self, event):
+        """Apply ``event`` to the in-memory state and persist it."""
+        self.apply(event)
+        self.persist([event])
+
+    def apply(self, event):
+        """Update the in-memory state only."""
+        with self._lock:
+            self._apply(event)
+
+    def persist(self, events):
+        """Write a batch of already applied events to the backend."""
+        with self._io_lock:
+            self._persist(events)
+
+    @abstractmethod
+    def _persist(self, events):
+        """Write ``events`` to the backend; called with ``_io_lock`` held."""
+
+    def _apply(self, event):
+        if event["op"] == "character":
+            target, key = self.characters, event["hero"]
+        elif event["op"] == "mission":
+            target, key = self.missions, event["id"]
+        elif event["op"] == "custom":
+            target, key = self.custom, (event["character"], event["rank"], event["mission"])
+        else:
+            return
+        if event["done"]:
+            target.add(key)
+        else:
+            target.discard(key)
+
+    def _upgrade(self, event):
+        """Convert a name-based event from an older version to ids; ``None`` if it no longer applies."""
+        if "char" not in event:
+            return event
+        if self.catalog is None:
+            raise ValueError("The mission catalog is needed to convert progress saved by an older version")
+        hero = event["char"]
+        if event["op"] == "character":
+            if hero not in self.catalog:
+                return None
+            return {"op": "character", "hero": self.catalog.hero_uid(hero), "done": event["done"]}
+        mission_id = None
+        if hero in self.catalog:
+            mission_id = self.catalog.mission_uid(hero, event["rank"], event["mission"])
+        if mission_id is None:
+            # A custom mission (or one no longer in the catalog): kept by name
+            return {"op": "custom", "character": hero, "rank": event["rank"], "mission": event["mission"],
+                    "done": event["done"]}
+        return {"op": "mission", "id": mission_id, "done": event["done"]}
+
+    def incomplete_missions(self, catalog, rank, heroes=None, role=None):
+        """``(hero, mission)`` pairs at ``rank`` not marked completed.
+
+        ``heroes`` and ``role`` (a key of :data:`heroes.ROLES`) narrow the result.
+        """
+        result = []
+        for hero in (heroes if heroes is not None else catalog.heroes):
+            if hero not in catalog or (role is not None and hero not in ROLES.get(role, ())):
+                continue
+            result.extend((hero, catalog.mission(slot).name) for slot in catalog.slots(hero, rank)
+                          if catalog.mission_uids[slot] not in self.missions)
+        return result
+
+    def compact(self, wait=False):
+        """Write the state out in its most compact form, if the backend has one."""
+
+    def close(self):
+        pass
+
+
+class CompletionJournal(CompletionStore):
+    def __init__(self, path="completed.json", compact_after=1000, catalog=None):
+        super().__init__(catalog)
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal"
+        # Journal being folded into the snapshot by a running compaction
+        self.rotated_path = self.journal_path + ".old"
+        self.compact_after = compact_after
+
+        self._journal = None
+        self._events = 0
+        self._compaction = None
+        # Set when load() converted name-based data
+        self._upgraded = False
+
+    def load(self):
+        """Read the snapshot and replay the journal over it."""
+        self._upgraded = False
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version", 1) >= STATE_VERSION:
+                self.characters = set(data.get("characters", []))
+                self.missions = set(data.get("missions", []))
+                self.custom = {tuple(key) for key in data.get("custom", [])}
+            else:
+                self._upgraded = True
+                for event in _legacy_events(data):
+                    event = self._upgrade(event)
+                    if event is not None:
+                        self._apply(event)
+
+        interrupted = os.path.exists(self.rotated_path)
+        for path in (self.rotated_path, self.journal_path):
+            if os.path.exists(path):
+                self._replay(path)
+
+        if interrupted or self._upgraded:
+            # A compaction did not finish last time, or the files use names: fold everything in now
+            if self._upgraded:
+                self._keep_legacy_files()
+            self._write_snapshot(self._snapshot())
+            if interrupted:
+                os.remove(self.rotated_path)
+            open(self.journal_path, "w").close()
+            self._events = 0
+
+        return {"characters": self.characters, "missions": self.missions, "custom": self.custom}
+
+    def _keep_legacy_files(self):
+        # Name-based files are about to be rewritten; keep the originals (once) in case of a bad conversion
+        for path in (self.path, self.journal_path):
+            backup = path + ".v1"
+            if os.path.exists(path) and not os.path.exists(backup):
+                with open(path, "rb") as source, open(backup, "wb") as target:
+                    target.write(source.read())
+
+    def _replay(self, path):
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # Torn last line from an interrupted write
+                    continue
+                if "char" in event:
+                    self._upgraded = True
+                    event = self._upgrade(event)
+                    if event is None:
+                        continue
+                self._apply(event)
+                self._events += 1
+
+    def persist(self, events):
+        super().persist(events)
+        if self._events >= self.compact_after:
+            self.compact()
+
+    def _persist(self, events):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a")
+        self._journal.write("".join(json.dumps(event) + "\n" for event in events))
+        self._journal.flush()
+        self._events += len(events)
+
+    def _snapshot(self):
+        with self._lock:
+            return _state_to_json(self.characters, self.missions, self.custom)
+
+    def _write_snapshot(self, data):
+        write_atomic(self.path, data)
+
+    def compact(self, wait=False):
+        """Fold the journal into a new snapshot on a background thread."""
+        with self._io_lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                compaction = self._compaction
+            elif self._events == 0:
+                compaction = None
+            else:
+                data = self._snapshot()
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                if os.path.exists(self.journal_path):
+                    os.replace(self.journal_path, self.rotated_path)
+                self._events = 0
+                compaction = self._compaction = threading.Thread(
+                    target=self._finish_compaction, args=(data,), name="completed-compaction", daemon=True)
+                compaction.start()
+        if wait and compaction is not None:
+            compaction.join()
+
+    def _finish_compaction(self, data):
+        self._write_snapshot(data)
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def close(self):
+        """Wait for a running compaction and close the journal."""
+        with self._io_lock:
+            compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        with self._io_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+class SQLiteStore(CompletionStore):
+    """Completion state in an SQLite database, one row per completion.
+
+    Several player profiles can share one file. A toggle is a single-row
+    insert or delete, and :meth:`incomplete_missions` runs as an indexed query
+    against a copy of the catalog kept in the database.
+    """
+
+    # Stored in PRAGMA user_version; 0 is a new file or the name-based tables
+    SCHEMA_VERSION = 3
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS completed_hero_ids (
+            profile TEXT NOT NULL,
+            hero_id INTEGER NOT NULL,
+            PRIMARY KEY (profile, hero_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS completed_mission_ids (
+            profile TEXT NOT NULL,
+            mission_id INTEGER NOT NULL,
+            PRIMARY KEY (profile, mission_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS completed_custom (
+            profile TEXT NOT NULL,
+            hero TEXT NOT NULL,
+            rank TEXT NOT NULL,
+            mission TEXT NOT NULL,
+            PRIMARY KEY (profile, hero, rank, mission)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS catalog_missions (
+            id INTEGER PRIMARY KEY,
+            hero TEXT NOT NULL,
+            role TEXT,
+            rank TEXT NOT NULL,
+            mission TEXT NOT NULL,
+            requirement INTEGER,
+            points INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS catalog_missions_by_rank ON catalog_missions (rank, hero);
+        CREATE INDEX IF NOT EXISTS catalog_missions_by_role ON catalog_missions (rank, role);
+    """
+
+    def __init__(self, path="completed.db", profile="default", catalog=None):
+        super().__init__(catalog)
+        self.path = path
+        self.profile = profile
+        import sqlite3  # not loaded at all with the default JSON store
+
+        # Toggles may be persisted from a background thread; _io_lock serializes access
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            (version,) = self.db.execute("PRAGMA user_version").fetchone()
+            legacy = version < self.SCHEMA_VERSION and self.db.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'completed_characters'").fetchone()
+            if version < self.SCHEMA_VERSION:
+                # The old catalog copy lacks the id or role column; it is rebuilt on first use
+                self.db.execute("DROP TABLE IF EXISTS catalog_missions")
+            for statement in self._SCHEMA.split(";"):
+                if statement.strip():
+                    self.db.execute(statement)
+            if legacy:
+                self._migrate_names()
+            self.db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._synced_catalog = None
+
+    @contextmanager
+    def _transaction(self):
+        """``BEGIN`` … ``COMMIT``, rolled back if anything fails.
+
+        Without the rollback one failed statement (e.g. "database is locked"
+        while another process writes) would leave the connection inside the
+        transaction, and every later ``BEGIN`` would fail.
+        """
+        self.db.execute("BEGIN")
+        try:
+            yield
+            self.db.execute("COMMIT")
+        except BaseException:
+            if self.db.in_transaction:
+                self.db.execute("ROLLBACK")
+            raise
+
+    def _migrate_names(self):
+        # Every profile of a file written by an older version, converted to ids
+        for profile, hero in self.db.execute("SELECT profile, hero FROM completed_characters").fetchall():
+            event = self._upgrade({"op": "character", "char": hero, "done": True})
+            if event is not None:
+                self.db.execute("INSERT INTO completed_hero_ids VALUES (?, ?) ON CONFLICT DO NOTHING",
+                                (profile, event["hero"]))
+        for profile, hero, rank, mission in self.db.execute(
+                "SELECT profile, hero, rank, mission FROM completed_missions").fetchall():
+            event = self._upgrade({"op": "mission", "char": hero, "rank": rank, "mission": mission, "done": True})
+            if event["op"] == "custom":
+                self.db.execute("INSERT INTO completed_custom VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                                (profile, hero, rank, mission))
+            else:
+                self.db.execute("INSERT INTO completed_mission_ids VALUES (?, ?) ON CONFLICT DO NOTHING",
+                                (profile, event["id"]))
+        self.db.execute("DROP TABLE completed_characters")
+        self.db.execute("DROP TABLE completed_missions")
+
+    def load(self):
+        with self._io_lock:
+            characters = {hero_id for (hero_id,) in self.db.execute(
+                "SELECT hero_id FROM completed_hero_ids WHERE profile = ?", (self.profile,))}
+            missions = {mission_id for (mission_id,) in self.db.execute(
+                "SELECT mission_id FROM completed_mission_ids WHERE profile = ?", (self.profile,))}
+            custom = set(self.db.execute(
+                "SELECT hero, rank, mission FROM completed_custom WHERE profile = ?", (self.profile,)))
+        with self._lock:
+            self.characters = characters
+            self.missions = missions
+            self.custom = custom
+        return {"characters": self.characters, "missions": self.missions, "custom": self.custom}
+
+    def profile_missions(self):
+        """``{profile: set of mission ids}`` for every profile in the file."""
+        result = {}
+        with self._io_lock:
+            for profile, mission_id in self.db.execute("SELECT profile, mission_id FROM completed_mission_ids"):
+                result.setdefault(profile, set()).add(mission_id)
+        return result
+
+    def _persist(self, events):
+        with self._transaction():
+            for event in events:
+                if event["op"] == "custom":
+                    key = (self.profile, event["character"], event["rank"], event["mission"])
+                    if event["done"]:
+                        self.db.execute("INSERT INTO completed_custom VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                                        key)
+                    else:
+                        self.db.execute("DELETE FROM completed_custom WHERE profile = ? AND hero = ? AND rank = ?"
+                                        " AND mission = ?", key)
+                    continue
+                if event["op"] == "character":
+                    table, column, key = "completed_hero_ids", "hero_id", event["hero"]
+                elif event["op"] == "mission":
+                    table, column, key = "completed_mission_ids", "mission_id", event["id"]
+                else:
+                    continue
+                if event["done"]:
+                    self.db.execute(f"INSERT INTO {table} VALUES (?, ?) ON CONFLICT DO NOTHING",
+                                    (self.profile, key))
+                else:
+                    self.db.execute(f"DELETE FROM {table} WHERE profile = ? AND {column} = ?", (self.profile, key))
+
+    def sync_catalog(self, catalog, roles=None):
+        """Replace the database copy of the mission catalog, tagged with each hero's role.
+
+        ``roles`` maps role names to heroes and defaults to :data:`heroes.ROLES`.
+        """
+        role_of = hero_roles(roles)
+        with self._io_lock:
+            with self._transaction():
+                self.db.execute("DELETE FROM catalog_missions")
+                self.db.executemany(
+                    "INSERT INTO catalog_missions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((catalog.mission_uids[slot], hero, role_of.get(hero), rank, mission.name,
+                      mission.requirement, mission.points)
+                     for slot, (hero, rank, mission) in enumerate(catalog.rows())))
+            self._synced_catalog = catalog
+
+    def incomplete_missions(self, catalog, rank, heroes=None, role=None):
+        if self._synced_catalog is not catalog:
+            self.sync_catalog(catalog)
+        query = ("SELECT m.hero, m.mission FROM catalog_missions m WHERE m.rank = ? AND NOT EXISTS ("
+                 "SELECT 1 FROM completed_mission_ids c WHERE c.profile = ? AND c.mission_id = m.id)")
+        params = [rank, self.profile]
+        if role is not None:
+            query += " AND m.role = ?"
+            params.append(role)
+        if heroes is not None:
+            heroes = list(heroes)
+            query += f" AND m.hero IN ({', '.join('?' * len(heroes))})"
+            params.extend(heroes)
+        with self._io_lock:
+            return self.db.execute(query + " ORDER BY m.hero, m.id", params).fetchall()
+
+    def close(self):
+        with self._io_lock:
+            self.db.close()
+
+
+class WriteBehindStore:
+    """Persists another store's changes from a background thread.
+
+    Toggles update the in-memory state right away and return; the events are
+    collected for ``delay`` seconds, reduced to the last change per character
+    or mission, and written in a single batch. Nothing on the calling thread
+    touches the disk until :meth:`flush`, :meth:`compact` or :meth:`close`.
+    """
+
+    def __init__(self, store, delay=0.5):
+        self.store = store
+        self.delay = delay
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._flushing = False
+        self._writing = False
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="completed-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def characters(self):
+        return self.store.characters
+
+    @property
+    def missions(self):
+        return self.store.missions
+
+    @property
+    def custom(self):
+        return self.store.custom
+
+    def load(self):
+        return self.store.load()
+
+    def set_character(self, hero_id, done):
+        self.record({"op": "character", "hero": hero_id, "done": done})
+
+    def set_mission(self, mission_id, done):
+        self.record({"op": "mission", "id": mission_id, "done": done})
+
+    def set_custom(self, hero, rank, mission, done):
+        self.record({"op": "custom", "character": hero, "rank": rank, "mission": mission, "done": done})
+
+    def record(self, event):
+        self.store.apply(event)
+        key = _event_key(event)
+        with self._condition:
+            # Only the latest change to each item needs to reach the disk
+            self._pending.pop(key, None)
+            self._pending[key] = event
+            self._condition.notify()
+
+    def incomplete_missions(self, catalog, rank, heroes=None, role=None):
+        return self.store.incomplete_missions(catalog, rank, heroes, role)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closing:
+                    self._condition.wait()
+                if self._closing and not self._pending:
+                    return
+                # Let rapid toggles pile up before writing
+                self._condition.wait_for(lambda: self._closing or self._flushing, timeout=self.delay)
+                events = list(self._pending.values())
+                self._pending.clear()
+                self._writing = True
+            try:
+                self.store.persist(events)
+            except Exception as e:
+                print(f"Could not save progress: {e}", file=sys.stderr)
+                with self._condition:
+                    if not (self._closing or self._flushing):
+                        # Retry with the next batch (e.g. the database was locked by another process);
+                        # newer changes to the same items win
+                        for event in events:
+                            self._pending.setdefault(_event_key(event), event)
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+    def flush(self):
+        """Block until every recorded change has been written."""
+        with self._condition:
+            self._flushing = True
+            self._condition.notify_all()
+            self._condition.wait_for(
+                lambda: not (self._pending or self._writing) or not self._thread.is_alive())
+            self._flushing = False
+
+    def compact(self, wait=False):
+        self.flush()
+        self.store.compact(wait=wait)
+
+    def close(self):
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._thread.join()
+        self.store.close()
+
+
+def open_store(path="completed.json", profile="default", write_behind=True, catalog=None):
+    """Open the completion store for ``path``: SQLite for ``.db``/``.sqlite`` files, otherwise the JSON journal.
+
+    With ``write_behind`` the store is wrapped in a :class:`WriteBehindStore`.
+    ``catalog`` is used to convert files saved by older, name-based versions.
+    """
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        store = SQLiteStore(path, profile=profile, catalog=catalog)
+    else:
+        store = CompletionJournal(path, catalog=catalog)
+    return WriteBehindStore(store) if write_behind else store
@@ -0,0 +1,95 @@
+"""Background worker for plan jobs.
+
+The GUI submits a job and keeps running its event loop; a single worker
+thread runs the job and leaves the outcome in a queue that the Tk thread polls
+with ``after()``. Only the newest request matters: submitting a job cancels
+every job still waiting or running, queued jobs that were cancelled are never
+started, and results of jobs cancelled while running are dropped. Long jobs
+can stop early by checking :attr:`Job.cancelled`.
+"""
+import queue
+import threading
+from typing import Any, NamedTuple, Optional
+
+
+class Job:
+    def __init__(self, job_id, fn, args, kwargs):
+        self.id = job_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class JobResult(NamedTuple):
+    job: Job
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+class PlanWorker:
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._latest = None
+        self._next_id = 0
+        self._thread = threading.Thread(target=self._run, name="plan-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn(*args, **kwargs)``, cancelling any earlier job."""
+        with self._lock:
+            if self._latest is not None:
+                self._latest.cancel()
+            self._next_id += 1
+            job = self._latest = Job(self._next_id, fn, args, kwargs)
+        self._jobs.put(job)
+        return job
+
+    def cancel(self):
+        with self._lock:
+            if self._latest is not None:
+                self._latest.cancel()
+
+    @property
+    def busy(self):
+        """``True`` while the latest job has not been delivered by :meth:`poll`."""
+        with self._lock:
+            return self._latest is not None
+
+    def poll(self):
+        """Finished results of the latest job (at most one), without blocking."""
+        results = []
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                return results
+            with self._lock:
+                if result.job is not self._latest or result.job.cancelled.is_set():
+                    continue
+                self._latest = None
+            results.append(result)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.cancelled.is_set():
+                continue
+            try:
+                result = JobResult(job, value=job.fn(*job.args, **job.kwargs))
+            except Exception as e:
+                result = JobResult(job, error=e)
+            if not job.cancelled.is_set():
+                self._results.put(result)
+
+    def close(self):
+        self.cancel()
+        self._jobs.put(None)
+        self._thread.join(timeout=1.0)